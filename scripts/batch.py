@@ -0,0 +1,99 @@
+#Imports
+import argparse
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+import viz
+from html_output import write_dashboard
+
+# Unified frames loaded once in the parent, keyed by (data_file, generation_file) and handed to each worker
+DATASETS = {}
+
+# Pool initializer: keep the shared datasets in the worker process
+def init_worker(datasets):
+    DATASETS.update(datasets)
+
+# Build and write one dashboard, returning its timings
+def run_job(job):
+    start = time.perf_counter()
+    frame = DATASETS[(job['data_file'], job['generation_file'])]
+    # A filter matching nothing would still write a page, with every chart empty
+    problems = viz.filter_problems(frame, job.get('states'), job.get('years'))
+    if problems:
+        raise ValueError("; ".join(problems))
+    fig = viz.build_dashboard(frame, job.get('states'), job.get('years'))
+    built = time.perf_counter()
+    os.makedirs(os.path.dirname(job['output']) or '.', exist_ok=True)
+    sizes = write_dashboard(fig, job['output'], **job.get('output_options', {}))
+    written = time.perf_counter()
+    return {
+        'name': job['name'],
+        'output': job['output'],
+        'build_s': round(built - start, 4),
+        'write_s': round(written - built, 4),
+        'output_bytes': sizes['output_bytes'],
+    }
+
+# Read a manifest (a list of jobs, or {"jobs": [...]}) and fill in default inputs and names
+def load_manifest(path):
+    with open(path) as f:
+        manifest = json.load(f)
+    jobs = manifest['jobs'] if isinstance(manifest, dict) else manifest
+    for job in jobs:
+        job.setdefault('data_file', viz.DATA_FILE)
+        job.setdefault('generation_file', viz.GENERATION_FILE)
+        job.setdefault('name', os.path.splitext(os.path.basename(job['output']))[0])
+    return jobs
+
+# Load each distinct pair of inputs once
+def load_datasets(jobs):
+    datasets = {}
+    for job in jobs:
+        key = (job['data_file'], job['generation_file'])
+        if key in datasets:
+            continue
+        try:
+            datasets[key] = viz.read_frame(*key)
+        except FileNotFoundError as e:
+            print(f"File not found: {e.filename}")
+            sys.exit(1)
+    return datasets
+
+# Run all jobs over a bounded process pool; results come back in manifest order
+def run_batch(jobs, max_workers=None):
+    datasets = load_datasets(jobs)
+    results = [None] * len(jobs)
+    with ProcessPoolExecutor(max_workers=max_workers, initializer=init_worker, initargs=(datasets,)) as pool:
+        futures = {pool.submit(run_job, job): i for i, job in enumerate(jobs)}
+        for future in as_completed(futures):
+            i = futures[future]
+            try:
+                result = future.result()
+            except Exception as e:
+                result = {'name': jobs[i]['name'], 'output': jobs[i]['output'], 'error': repr(e)}
+                print(f"{result['name']}: failed ({result['error']})")
+            else:
+                print(f"{result['name']}: build {result['build_s']:.3f}s, write {result['write_s']:.3f}s, "
+                      f"{result['output_bytes']:,} bytes -> {result['output']}")
+            results[i] = result
+    return results
+
+# Entry point: build every dashboard in a manifest
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Build many dashboards from one manifest.")
+    parser.add_argument('manifest', help="JSON manifest of jobs (output, optional data_file, "
+                                         "generation_file, states, years, output_options)")
+    parser.add_argument('--workers', type=int, default=None, help="maximum concurrent worker processes")
+    parser.add_argument('--report', help="write per-job timings to this JSON file")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    results = run_batch(load_manifest(args.manifest), args.workers)
+    print(f"{len(results)} dashboards in {time.perf_counter() - start:.2f}s")
+    if args.report:
+        with open(args.report, 'w') as f:
+            json.dump(results, f, indent=2)
+    if any('error' in r for r in results):
+        sys.exit(1)
@@ -0,0 +1,91 @@
+#Imports
+import argparse
+import json
+import os
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+import pandas as pd
+
+# Constants
+# Scales as (regions, years, rows per region and year)
+DEFAULT_SCALES = [(15, 6, 1), (100, 10, 1), (500, 20, 1), (500, 20, 20), (1000, 20, 100)]
+
+# Parse "REGIONSxYEARSxROWS" scale strings
+def parse_scales(text):
+    return [tuple(int(part) for part in scale.split('x')) for scale in text.split(',')]
+
+# Benchmark one scale in the current process: generate data, build the dashboard and write it
+def run_scale(scale, workdir, trace_memory, line_mode=None):
+    # Imported here so every scale measures a fresh process
+    import data_gen
+    import viz
+    from html_output import write_dashboard
+    from profiling import start_profile, finish_profile, phase
+
+    regions, years, rows_per_year = scale
+    start = time.perf_counter()
+    main_df, generation_df = data_gen.generate(regions, list(range(2000, 2000 + years)), rows_per_year)
+    data_gen.save(main_df, generation_df, workdir)
+    generate_s = time.perf_counter() - start
+
+    # Measure the cold path: no caches or persisted points, inputs from this scale's files
+    viz.DATA_FILE = os.path.join(workdir, "dataframe1.csv")
+    viz.GENERATION_FILE = os.path.join(workdir, "dataframe2.csv")
+    viz.USE_RESULT_CACHE = False
+    viz.USE_COLUMNAR_CACHE = False
+    viz.PERSIST_POINTS = False
+    viz.LINE_MODE = line_mode or viz.LINE_MODE
+    # Synthetic regions ("Texas 2") are placed in their base state's box
+    names = data_gen.region_names(regions)
+    viz.STATE_BOXES = pd.DataFrame(
+        [viz.STATE_COORDS[data_gen.base_state(name)] for name in names], index=names
+    )
+
+    output_file = os.path.join(workdir, "dashboard.html")
+    start_profile(trace_memory)
+    fig = viz.build_layout()
+    with phase('write_html'):
+        sizes = write_dashboard(fig, output_file)
+    report = finish_profile(fig, sizes)
+    return {
+        'regions': regions, 'years': years, 'rows_per_year': rows_per_year,
+        'rows': len(main_df), 'generate_s': round(generate_s, 3), **report
+    }
+
+# Run every scale in its own worker process so peak memory is measured per scale
+def run_benchmarks(scales, trace_memory=False, line_mode=None):
+    results = []
+    for scale in scales:
+        with tempfile.TemporaryDirectory() as workdir:
+            with ProcessPoolExecutor(max_workers=1) as pool:
+                result = pool.submit(run_scale, scale, workdir, trace_memory, line_mode).result()
+        phases = result['phases']
+        # Peak RSS is unavailable on Windows
+        rss = result['max_rss_bytes']
+        rss_text = f"{rss / 2**20:8.1f} MiB" if rss is not None else "     n/a"
+        print(f"{result['regions']:>6} regions x {result['years']:>3} years x {result['rows_per_year']:>4} rows "
+              f"({result['rows']:>10,} rows): build {phases['build_layout']['seconds']:7.2f}s, "
+              f"write {phases['write_html']['seconds']:6.2f}s, {result['trace_count']:>6,} traces, "
+              f"{result['point_count']:>9,} points, rss {rss_text}, "
+              f"html {result['output']['output_bytes'] / 2**20:7.2f} MiB")
+        results.append(result)
+    return results
+
+# Entry point: benchmark the dashboard build at several data scales
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark dashboard build and output at several data scales.")
+    parser.add_argument('--scales', type=parse_scales,
+                        default=DEFAULT_SCALES, help="comma-separated REGIONSxYEARSxROWS, e.g. 15x6x1,500x20x10")
+    parser.add_argument('--trace-memory', action='store_true',
+                        help="also record the tracemalloc peak (slows the build)")
+    parser.add_argument('--line-mode', choices=['per_state', 'combined'],
+                        help="line chart mode to benchmark (default: viz.LINE_MODE)")
+    parser.add_argument('--output', help="write full results to this JSON file")
+    args = parser.parse_args()
+
+    results = run_benchmarks(args.scales, args.trace_memory, args.line_mode)
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+        print(f"Results saved to {args.output}")
@@ -0,0 +1,237 @@
+#Imports
+import time
+START = time.perf_counter()  # import and check times are measured from here
+import argparse
+import csv
+import json
+import os
+import sys
+from datetime import datetime
+from config import DATA_FILE, GENERATION_FILE, OUTPUT_FILE, MAIN_COLUMNS, GENERATION_COLUMNS, TIME_COLUMN
+from profiling import phase, start_profile, finish_profile
+
+# Constants
+MAX_PROBLEMS = 20       # problems reported per input file before the scan stops
+SAMPLE_ROWS = 10_000    # data rows --check parses per input file, unless --full-scan is given
+IMAGE_FORMAT_CHOICES = ('png', 'jpg', 'webp', 'svg', 'pdf')  # formats the static image export can write
+
+# Parse "Texas,New Mexico" into a list of state names
+def parse_states(text):
+    states = [state.strip() for state in text.split(',') if state.strip()]
+    if not states:
+        raise ValueError("no states given")
+    return states
+
+# Parse "png,svg" into a list of image formats
+def parse_formats(text):
+    formats = [fmt.strip().lower() for fmt in text.split(',') if fmt.strip()]
+    unknown = [fmt for fmt in formats if fmt not in IMAGE_FORMAT_CHOICES]
+    if not formats or unknown:
+        raise ValueError(f"image formats must be among {', '.join(IMAGE_FORMAT_CHOICES)}")
+    return formats
+
+# Parse "2021" or "2020-2023" into an inclusive (first, last) year range
+def parse_years(text):
+    first, _, last = text.partition('-')
+    years = (int(first), int(last or first))
+    if years[0] > years[1]:
+        raise ValueError(f"first year {years[0]} is after last year {years[1]}")
+    return years
+
+# Scan the header and up to max_rows data rows (all of them if None) of one input file with the csv
+# module: problems found, plus the rows scanned, their states and years, and whether the file was read to the end
+def scan_input(path, columns, max_rows=SAMPLE_ROWS):
+    result = {'problems': [], 'rows': 0, 'states': set(), 'years': set(), 'complete': True}
+    try:
+        with open(path, newline='') as f:
+            reader = csv.reader(f)
+            header = next(reader, [])
+            if TIME_COLUMN in header:
+                # Timestamped inputs carry TIME_COLUMN in place of Year
+                columns = [TIME_COLUMN if column == 'Year' else column for column in columns]
+            missing = [column for column in columns if column not in header]
+            if missing:
+                result['problems'].append(f"{path}: missing columns {', '.join(missing)}")
+                return result
+            index = {column: header.index(column) for column in columns}
+            for line, row in enumerate(reader, start=2):
+                if max_rows is not None and line - 2 >= max_rows:
+                    result['complete'] = False
+                    break
+                try:
+                    values = {column: row[i] for column, i in index.items()}
+                    for column in columns:
+                        if column not in ('State', TIME_COLUMN):
+                            float(values[column])
+                    if TIME_COLUMN in values:
+                        year = datetime.fromisoformat(values[TIME_COLUMN]).year
+                    else:
+                        year = int(float(values['Year']))
+                except (ValueError, IndexError):
+                    result['problems'].append(f"{path}:{line}: missing, non-numeric or invalid time values")
+                    if len(result['problems']) >= MAX_PROBLEMS:
+                        break
+                    continue
+                result['rows'] += 1
+                result['states'].add(values['State'])
+                result['years'].add(year)
+    except FileNotFoundError:
+        result['problems'].append(f"{path}: file not found")
+        return result
+    if result['rows'] == 0 and not result['problems']:
+        result['problems'].append(f"{path}: no data rows")
+    return result
+
+# Validate inputs, filters and output location without loading the build modules. Only the first
+# max_rows rows of each input are parsed (all of them if None); filters that match none of those rows are
+# problems when the whole file was scanned, and notes otherwise. Returns problems, notes and the scans
+def check_inputs(data_file, generation_file, output_file, states=None, years=None, max_rows=SAMPLE_ROWS):
+    main = scan_input(data_file, MAIN_COLUMNS, max_rows)
+    generation = scan_input(generation_file, GENERATION_COLUMNS, max_rows)
+    problems = main['problems'] + generation['problems']
+    notes = []
+    unmatched = []
+    if states and main['rows']:
+        unknown = [state for state in states if state not in main['states']]
+        if unknown:
+            unmatched.append(f"no rows for states {', '.join(unknown)}")
+    if years and main['rows'] and not any(years[0] <= year <= years[1] for year in main['years']):
+        unmatched.append(f"no rows in years {years[0]}-{years[1]}")
+    for message in unmatched:
+        if main['complete']:
+            problems.append(f"{data_file}: {message}")
+        else:
+            notes.append(f"{data_file}: {message} in the first {main['rows']:,} rows (--full-scan checks them all)")
+    output_dir = os.path.dirname(output_file) or '.'
+    if not os.path.isdir(output_dir):
+        problems.append(f"{output_file}: output directory {output_dir} does not exist")
+    return problems, notes, {data_file: main, generation_file: generation}
+
+# Command line entry point; returns the exit status
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Build the energy dashboard.")
+    parser.add_argument('--data', default=DATA_FILE, help="main dataset CSV")
+    parser.add_argument('--generation', default=GENERATION_FILE, help="generation dataset CSV")
+    parser.add_argument('--output', default=OUTPUT_FILE, help="dashboard HTML to write")
+    parser.add_argument('--states', type=parse_states, help="comma-separated states to include")
+    parser.add_argument('--years', type=parse_years, help="year or inclusive FIRST-LAST range to include")
+    parser.add_argument('--check', action='store_true',
+                        help="validate inputs, filters and output location, then exit (no build)")
+    parser.add_argument('--dry-run', action='store_true',
+                        help="validate like --check and print what would be built, then exit")
+    parser.add_argument('--full-scan', action='store_true',
+                        help=f"make --check/--dry-run parse every input row, not just the first {SAMPLE_ROWS:,}")
+    parser.add_argument('--profile', nargs='?', const='-', metavar='REPORT',
+                        help="time each build phase (result cache off) and write a JSON report "
+                             "to REPORT, or print it")
+    parser.add_argument('--split', action='store_true',
+                        help="write an overview page plus per-state detail files loaded on demand "
+                             "(serve the output directory over HTTP to view it)")
+    parser.add_argument('--fast', action='store_true',
+                        help="assemble the figure as a plain dict, bypassing plotly's validation")
+    parser.add_argument('--concurrent', action='store_true',
+                        help="read the inputs and build the chart layers on a thread pool (same output)")
+    parser.add_argument('--images', type=parse_formats, metavar='FORMATS',
+                        help="also export each state dropdown view as a static image in these formats, "
+                             "e.g. png,svg (needs kaleido for images not in the render cache)")
+    parser.add_argument('--image-scale', type=float, default=1.0,
+                        help="image scale factor, e.g. 0.25 for thumbnails")
+    parser.add_argument('--size-report', action='store_true',
+                        help="also report the bytes saved against plotly's default HTML output "
+                             "(renders the page a second time)")
+    parser.add_argument('--verify-fast-path', action='store_true',
+                        help="check that the fast path builds the same figure as the validated path, then exit")
+    args = parser.parse_args(argv)
+    filtered = args.states is not None or args.years is not None
+    if args.split and filtered:
+        parser.error("--split builds every state; it can't be combined with --states/--years")
+
+    # Checks only need the csv module, so they finish before pandas or plotly would have loaded
+    if args.check or args.dry_run:
+        problems, notes, scans = check_inputs(args.data, args.generation, args.output, args.states, args.years,
+                                              None if args.full_scan else SAMPLE_ROWS)
+        for message in problems + notes:
+            print(message)
+        if args.dry_run and not problems:
+            for path, scan in scans.items():
+                print(f"{path}: {scan['rows']:,} rows{'' if scan['complete'] else ' sampled'}, "
+                      f"{len(scan['states'])} states, years {min(scan['years'])}-{max(scan['years'])}")
+            print(f"Would write {args.output} ({'split' if args.split else 'single page'}, "
+                  f"{'fast' if args.fast else 'validated'} path)"
+                  + (f" for states {args.states or 'all'} and years {args.years or 'all'}" if filtered else ""))
+        print(f"{'Inputs OK' if not problems else f'{len(problems)} problems'} "
+              f"({(time.perf_counter() - START) * 1000:.0f} ms, build modules not imported)")
+        return 1 if problems else 0
+
+    if args.profile:
+        start_profile()
+    import_start = time.perf_counter()
+    with phase('import'):
+        import viz
+        from html_output import write_dashboard, write_split_dashboard
+    import_s = time.perf_counter() - import_start
+
+    viz.DATA_FILE, viz.GENERATION_FILE = args.data, args.generation
+    viz.FAST_PATH = viz.FAST_PATH or args.fast
+    viz.SPLIT_OUTPUT = viz.SPLIT_OUTPUT or args.split
+    viz.CONCURRENT_BUILD = viz.CONCURRENT_BUILD or args.concurrent
+    if args.profile:
+        viz.USE_RESULT_CACHE = False  # every phase runs when profiling
+
+    if args.verify_fast_path:
+        differences = viz.verify_fast_path()
+        if differences:
+            print(f"Fast path differs from the validated figure at {len(differences)} paths:")
+            print("\n".join(differences[:20]))
+            return 1
+        print("Fast path figure matches the validated figure")
+        return 0
+
+    build_start = time.perf_counter()
+    payloads = None
+    if filtered:
+        try:
+            frame = viz.read_frame(args.data, args.generation)
+        except FileNotFoundError as e:
+            print(f"File not found: {e.filename}")
+            return 1
+        with phase('build_layout'):
+            fig = viz.build_dashboard(frame, args.states, args.years)
+    elif viz.SPLIT_OUTPUT:
+        fig, payloads = viz.build_split_layout()
+    else:
+        fig = viz.build_layout()
+    write_start = time.perf_counter()
+    with phase('write_html'):
+        if viz.SPLIT_OUTPUT:
+            sizes = write_split_dashboard(fig, payloads, args.output, viz.ALL_STATES, report=args.size_report)
+        else:
+            sizes = write_dashboard(fig, args.output, report=args.size_report)
+    write_s = time.perf_counter() - write_start
+    print(f"Dashboard saved to {args.output}")
+    print(", ".join(f"{name}: {size:,}" for name, size in sizes.items()))
+    print(f"import: {import_s:.2f}s, build: {write_start - build_start:.2f}s, write: {write_s:.2f}s")
+
+    if args.images:
+        export_start = time.perf_counter()
+        with phase('export_images'):
+            from image_output import export_images
+            counts = export_images(fig, args.output, viz.ALL_STATES, args.images, payloads,
+                                   scale=args.image_scale, use_cache=viz.USE_RESULT_CACHE)
+        print(f"Images: {counts['images']} written ({counts['rendered']} rendered, {counts['cached']} from cache"
+              + (f", {counts['skipped']} skipped" if counts['skipped'] else "")
+              + f") in {time.perf_counter() - export_start:.2f}s")
+
+    if args.profile:
+        report = json.dumps(finish_profile(fig, sizes), indent=2)
+        if args.profile == '-':
+            print(report)
+        else:
+            with open(args.profile, 'w') as f:
+                f.write(report)
+            print(f"Profile report saved to {args.profile}")
+    return 0
+
+# Entry point to build and save dashboard
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,96 @@
+#Imports
+import hashlib
+import json
+import os
+import pandas as pd
+
+# pyarrow is optional: without it, inputs are parsed from CSV every run
+try:
+    import pyarrow.feather as feather
+except ImportError:
+    feather = None
+
+# Constants
+CACHE_DIR = "data/.cache"
+
+# Cached Arrow file and metadata paths for a source file (keyed on its absolute path)
+def cache_paths(path):
+    key = hashlib.sha1(os.path.abspath(path).encode()).hexdigest()[:10]
+    base = os.path.join(CACHE_DIR, f"{os.path.basename(path)}-{key}")
+    return base + ".arrow", base + ".json"
+
+# Content hash of a source file, read in blocks
+def file_hash(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+# Source fingerprint stored next to the cached copy
+def file_fingerprint(path):
+    st = os.stat(path)
+    return {'mtime_ns': st.st_mtime_ns, 'size': st.st_size, 'sha256': file_hash(path)}
+
+# Check the cached copy against the source: mtime/size first, content hash when only mtime moved
+def is_fresh(path, meta):
+    st = os.stat(path)
+    if meta.get('size') != st.st_size:
+        return False
+    if meta.get('mtime_ns') == st.st_mtime_ns:
+        return True
+    return meta.get('sha256') == file_hash(path)
+
+# Content hash of a source file, reusing a stored hash while the file's mtime and size are unchanged: the
+# columnar cache's metadata when it matches, otherwise a fingerprint kept for this purpose
+def source_hash(path):
+    st = os.stat(path)
+    arrow_path, meta_path = cache_paths(path)
+    hash_path = os.path.splitext(meta_path)[0] + ".hash.json"
+    for stored_path in (meta_path, hash_path):
+        try:
+            with open(stored_path) as f:
+                meta = json.load(f)
+        except (FileNotFoundError, ValueError):
+            continue
+        if meta.get('size') == st.st_size and meta.get('mtime_ns') == st.st_mtime_ns and 'sha256' in meta:
+            return meta['sha256']
+    meta = file_fingerprint(path)
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    write_meta(hash_path, meta)
+    return meta['sha256']
+
+# Write metadata atomically so a concurrent reader never sees a partial file
+def write_meta(meta_path, meta):
+    tmp_path = meta_path + ".tmp"
+    with open(tmp_path, 'w') as f:
+        json.dump(meta, f)
+    os.replace(tmp_path, meta_path)
+
+# Read a CSV through the columnar cache, loading only the requested columns
+def read_csv_cached(path, columns=None):
+    if feather is None:
+        return pd.read_csv(path, usecols=columns)
+
+    arrow_path, meta_path = cache_paths(path)
+    meta = None
+    if os.path.exists(meta_path) and os.path.exists(arrow_path):
+        with open(meta_path) as f:
+            meta = json.load(f)
+
+    if meta is not None and is_fresh(path, meta):
+        # Uncompressed Arrow IPC is memory-mapped, so unread columns are never paged in
+        table = feather.read_table(arrow_path, columns=columns, memory_map=True)
+        # Refresh the stored mtime after a hash match so later runs take the fast check
+        if meta['mtime_ns'] != os.stat(path).st_mtime_ns:
+            write_meta(meta_path, {**meta, 'mtime_ns': os.stat(path).st_mtime_ns})
+        return table.to_pandas()
+
+    # Cache miss: parse the CSV once and store it columnar for later runs
+    df = pd.read_csv(path, engine='pyarrow')
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    tmp_path = arrow_path + ".tmp"
+    feather.write_feather(df, tmp_path, compression='uncompressed')
+    os.replace(tmp_path, arrow_path)
+    write_meta(meta_path, file_fingerprint(path))
+    return df[columns] if columns else df
@@ -0,0 +1,14 @@
+# Input and output settings shared by the build modules and the command line, kept free of heavy
+# imports so the CLI can validate inputs without loading pandas or plotly
+
+# Constants
+DATA_FILE = "data/dataframe1.csv"
+GENERATION_FILE = "data/dataframe2.csv"
+OUTPUT_FILE = "outputs/golden_image.html"
+
+# Columns each loader needs from its input file
+MAIN_COLUMNS = ['State', 'Year', 'Sales', 'Profit', 'Discount', 'Solar_Plants', 'Wind_Plants']
+GENERATION_COLUMNS = ['State', 'Year', 'Solar_Generation_MWh', 'Wind_Generation_MWh']
+
+# Timestamped inputs (e.g. hourly or daily feeds) carry this column in place of Year
+TIME_COLUMN = 'Timestamp'
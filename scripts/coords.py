@@ -0,0 +1,185 @@
+#Imports
+import hashlib
+import json
+import os
+import threading
+from contextlib import contextmanager
+import numpy as np
+
+# fcntl locks on Unix; Windows locks with msvcrt instead
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+    import msvcrt
+
+# Constants
+POINT_STORE_DIR = "data/.cache/points"
+POINT_COLUMNS = 2     # unit samples per point: lat offset, lon offset
+COMPACT_SEGMENTS = 4  # average segments per key above which the store is rewritten with one per key
+
+# Stable 64-bit seed for a key (unlike hash(), identical in every process)
+def stable_seed(key):
+    return int.from_bytes(hashlib.blake2b(key.encode(), digest_size=8).digest(), 'little')
+
+# First `count` unit samples for a key from its own generator; growing the count keeps earlier points
+def key_samples(key, count):
+    return np.random.default_rng(stable_seed(key)).random((count, POINT_COLUMNS), dtype=np.float32)
+
+# Gather each key's first `count` rows from a (starts, samples) layout in one vectorized step
+def gather(samples, starts, counts):
+    counts = np.asarray(counts, dtype=np.int64)
+    offsets = np.repeat(np.asarray(starts, dtype=np.int64) - (np.cumsum(counts) - counts), counts)
+    return samples[offsets + np.arange(counts.sum())]
+
+# Exclusive lock shared by every process using a store directory, held while the store changes
+@contextmanager
+def store_lock(directory):
+    os.makedirs(directory, exist_ok=True)
+    with open(os.path.join(directory, "points.lock"), 'a+b') as f:
+        if fcntl is not None:
+            fcntl.flock(f, fcntl.LOCK_EX)
+        else:
+            f.seek(0)
+            msvcrt.locking(f.fileno(), msvcrt.LK_LOCK, 1)
+        try:
+            yield
+        finally:
+            if fcntl is not None:
+                fcntl.flock(f, fcntl.LOCK_UN)
+            else:
+                f.seek(0)
+                msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+
+# Persisted samples: a flat float32 file of rows, memory-mapped, plus a JSON index naming that file and
+# mapping each key to the [start, count] segments holding its first rows in order. Rows a published index
+# covers never change, so other processes can keep them mapped: appends only write past them, and
+# compaction writes a new file
+class PointStore:
+    def __init__(self, directory=POINT_STORE_DIR):
+        self.directory = directory
+        self.index_path = os.path.join(directory, "points-index.json")
+        self.file, self.index, self.samples = self.load()
+
+    # Open the stored samples; a missing or unreadable pair is treated as empty
+    def load(self):
+        empty = (None, {}, np.empty((0, POINT_COLUMNS), dtype=np.float32))
+        try:
+            with open(self.index_path) as f:
+                index = json.load(f)
+            file, rows, keys = index['file'], index['rows'], index['keys']
+            # Rows past the indexed count are from an append that never reached the index, and are ignored
+            samples = self.open_samples(file, rows)
+        except (FileNotFoundError, ValueError, KeyError):
+            return empty
+        return file, keys, samples
+
+    # Memory-map the first `rows` rows of a samples file (failing if it holds fewer)
+    def open_samples(self, file, rows):
+        if rows == 0:
+            return np.empty((0, POINT_COLUMNS), dtype=np.float32)
+        return np.memmap(os.path.join(self.directory, file), dtype=np.float32, mode='r', shape=(rows, POINT_COLUMNS))
+
+    # Name for a samples file that doesn't exist yet
+    def new_file(self):
+        numbers = [int(name[len("points-"):-len(".f32")]) for name in os.listdir(self.directory)
+                   if name.startswith("points-") and name.endswith(".f32")]
+        return f"points-{max(numbers, default=-1) + 1}.f32"
+
+    # Replace the index file in one step; it's written after the rows it covers, so it never points past them
+    def save_index(self):
+        tmp_index = f"{self.index_path}.{os.getpid()}.tmp"
+        with open(tmp_index, 'w') as f:
+            json.dump({'file': self.file, 'rows': len(self.samples), 'keys': self.index}, f)
+        os.replace(tmp_index, self.index_path)
+
+    # Keys (with the counts wanted) that the store holds too few rows for
+    def missing(self, keys, counts):
+        wanted = {}
+        for key, count in zip(keys, counts):
+            if count > 0 and stored_rows(self.index.get(key, [])) < count:
+                wanted[key] = int(max(count, wanted.get(key, 0)))
+        return wanted
+
+    # Append the rows missing for keys that are new or too short. Samples are prefix-stable, so a key that
+    # grows gets only its tail rows, as a new segment; once segments outnumber keys by COMPACT_SEGMENTS,
+    # the store is compacted. Called with the store lock held and the index just reloaded
+    def extend(self, wanted):
+        blocks = []
+        rows = len(self.samples)
+        for key, count in wanted.items():
+            segments = self.index.setdefault(key, [])
+            stored = stored_rows(segments)
+            blocks.append(key_samples(key, count)[stored:])
+            segments.append([rows, count - stored])
+            rows += count - stored
+        if self.file is None:
+            self.file = self.new_file()
+        path = os.path.join(self.directory, self.file)
+        with open(path, 'r+b' if os.path.exists(path) else 'wb') as f:
+            # Rows an interrupted append left past the indexed count are overwritten, never truncated
+            f.seek(self.samples.nbytes)
+            f.write(np.concatenate(blocks).tobytes())
+        self.samples = self.open_samples(self.file, rows)
+        if sum(len(segments) for segments in self.index.values()) > COMPACT_SEGMENTS * len(self.index):
+            self.compact()
+        else:
+            self.save_index()
+
+    # Rewrite the samples with each key's rows in one contiguous segment, into a new file so the index
+    # swap is the only step that changes what the store holds
+    def compact(self):
+        keys = list(self.index)
+        starts, counts = zip(*(segment for key in keys for segment in self.index[key]))
+        samples = gather(self.samples, starts, counts)
+        old_file, self.file = self.file, self.new_file()
+        samples.tofile(os.path.join(self.directory, self.file))
+        offsets = np.cumsum([0] + [stored_rows(self.index[key]) for key in keys])
+        self.index = {key: [[int(offsets[i]), int(offsets[i + 1] - offsets[i])]] for i, key in enumerate(keys)}
+        self.samples = self.open_samples(self.file, len(samples))
+        self.save_index()
+        try:
+            os.remove(os.path.join(self.directory, old_file))
+        except OSError:
+            pass  # Windows won't remove a file another process has mapped; it's left unused
+
+    # Samples for many keys in one batched call, concatenated in key order
+    def samples_for(self, keys, counts):
+        if self.missing(keys, counts):
+            with store_lock(self.directory):
+                # Other processes may have extended or compacted the store since it was loaded
+                self.file, self.index, self.samples = self.load()
+                wanted = self.missing(keys, counts)
+                if wanted:
+                    self.extend(wanted)
+        # Each key's first `count` rows, taken from its segments in order
+        starts, lengths = [], []
+        for key, count in zip(keys, counts):
+            for start, length in self.index[key] if count > 0 else []:
+                take = min(length, count)
+                starts.append(start)
+                lengths.append(take)
+                count -= take
+                if count == 0:
+                    break
+        return gather(self.samples, starts, lengths)
+
+# Rows stored for a key across its segments
+def stored_rows(segments):
+    return sum(length for _, length in segments)
+
+# Store shared by every call in this process, opened on first use; the lock serializes threads
+# of a concurrent build (store_lock serializes processes)
+STORE = None
+STORE_LOCK = threading.Lock()
+
+# Unit samples for many keys at once, through the persisted store unless persist is False
+def point_samples(keys, counts, persist=True):
+    global STORE
+    if not persist:
+        blocks = [key_samples(key, count) for key, count in zip(keys, counts)]
+        return np.concatenate(blocks) if blocks else np.empty((0, POINT_COLUMNS), dtype=np.float32)
+    with STORE_LOCK:
+        if STORE is None:
+            STORE = PointStore()
+        return STORE.samples_for(keys, counts)
@@ -1,10 +1,8 @@
 import pandas as pd
 import numpy as np
+import argparse
 import os
 
-# Seed for reproducibility
-np.random.seed(4)
-
 states = [
     'Arizona', 'California', 'Colorado', 'Florida', 'Georgia',
     'Illinois', 'Iowa', 'Kansas', 'Minnesota', 'Nevada',
@@ -12,51 +10,94 @@ states = [
 ]
 years = [2019, 2020, 2021, 2022, 2023, 2024]
 
-main_data = []
-generation_data = []
-
-for state in states:
-    for year in years:
-        base_sales = np.random.randint(50000, 150000)
-
-        if state in ['California', 'Arizona', 'Nevada', 'Florida']:
-            solar_plants = np.random.randint(20, 50)
-            wind_plants = np.random.randint(5, 20)
-        elif state in ['Iowa', 'Kansas', 'Oklahoma', 'North Dakota']:
-            solar_plants = np.random.randint(5, 20)
-            wind_plants = np.random.randint(20, 50)
-        else:
-            solar_plants = np.random.randint(10, 30)
-            wind_plants = np.random.randint(10, 30)
-
-        # Generation values
-        solar_gen = solar_plants * np.random.randint(1000, 3000)
-        wind_gen = wind_plants * np.random.randint(2000, 5000)
-
-        # Main dataset (without generation columns)
-        main_data.append({
-            'State': state,
-            'Year': year,
-            'Sales': base_sales,
-            'Profit': np.random.randint(5000, 30000),
-            'Discount': round(np.random.uniform(0.1, 0.5), 2),
-            'Solar_Plants': solar_plants,
-            'Wind_Plants': wind_plants,
-            'Total_Plants': solar_plants + wind_plants
-        })
-
-        # Generation dataset
-        generation_data.append({
-            'State': state,
-            'Year': year,
-            'Solar_Generation_MWh': solar_gen,
-            'Wind_Generation_MWh': wind_gen
-        })
-
-# Save both datasets
-os.makedirs("data", exist_ok=True)
-pd.DataFrame(main_data).to_csv("data/dataframe1.csv", index=False)
-pd.DataFrame(generation_data).to_csv("data/dataframe2.csv", index=False)
-
-print("'dataframe1.csv' saved (no power columns)")
-print("'dataframe2.csv' saved (only generation data)")
+# Plant count ranges [low, high) by state profile: (solar_low, solar_high, wind_low, wind_high)
+SUNNY_STATES = ['California', 'Arizona', 'Nevada', 'Florida']
+WINDY_STATES = ['Iowa', 'Kansas', 'Oklahoma', 'North Dakota']
+PLANT_RANGES = {'sunny': (20, 50, 5, 20), 'windy': (5, 20, 20, 50), 'balanced': (10, 30, 10, 30)}
+
+# Region names: the base states first, then numbered regions that reuse a base state (e.g. "Texas 2")
+def region_names(n_regions):
+    return [
+        states[i % len(states)] if i < len(states) else f"{states[i % len(states)]} {i // len(states) + 1}"
+        for i in range(n_regions)
+    ]
+
+# Base state a region name was derived from
+def base_state(region):
+    return region if region in states else region.rsplit(' ', 1)[0]
+
+# Generate both datasets in one vectorized pass: rows_per_year rows per region and year, or with a
+# frequency (e.g. 'h' or 'D') one row per region and timestamp over the years, keyed by Timestamp instead of Year
+def generate(n_regions=len(states), year_list=years, rows_per_year=1, plant_scale=1.0, seed=4, freq=None):
+    rng = np.random.default_rng(seed)
+    regions = region_names(n_regions)
+    profiles = [
+        'sunny' if base_state(r) in SUNNY_STATES else 'windy' if base_state(r) in WINDY_STATES else 'balanced'
+        for r in regions
+    ]
+    ranges = np.array([PLANT_RANGES[p] for p in profiles])
+
+    if freq:
+        times = pd.date_range(f"{year_list[0]}-01-01", f"{year_list[-1] + 1}-01-01", freq=freq, inclusive='left')
+        time_key = ('Timestamp', np.tile(times.to_numpy(), n_regions))
+        per_region = len(times)
+    else:
+        # One row per (region, year, record), regions outermost like the original nested loops
+        time_key = ('Year', np.tile(np.repeat(np.asarray(year_list), rows_per_year), n_regions))
+        per_region = len(year_list) * rows_per_year
+    region_idx = np.repeat(np.arange(n_regions), per_region)
+    n = len(region_idx)
+    r = ranges[region_idx]
+
+    solar_plants = np.round(rng.integers(r[:, 0], r[:, 1]) * plant_scale).astype(np.int64)
+    wind_plants = np.round(rng.integers(r[:, 2], r[:, 3]) * plant_scale).astype(np.int64)
+
+    state_col = pd.Categorical.from_codes(region_idx, categories=regions)
+
+    # Main dataset (without generation columns)
+    main_df = pd.DataFrame({
+        'State': state_col,
+        time_key[0]: time_key[1],
+        'Sales': rng.integers(50000, 150000, n),
+        'Profit': rng.integers(5000, 30000, n),
+        'Discount': rng.uniform(0.1, 0.5, n).round(2),
+        'Solar_Plants': solar_plants,
+        'Wind_Plants': wind_plants,
+        'Total_Plants': solar_plants + wind_plants
+    })
+
+    # Generation dataset
+    generation_df = pd.DataFrame({
+        'State': state_col,
+        time_key[0]: time_key[1],
+        'Solar_Generation_MWh': solar_plants * rng.integers(1000, 3000, n),
+        'Wind_Generation_MWh': wind_plants * rng.integers(2000, 5000, n)
+    })
+    return main_df, generation_df
+
+# Save both datasets as CSV
+def save(main_df, generation_df, output_dir="data"):
+    os.makedirs(output_dir, exist_ok=True)
+    main_df.to_csv(os.path.join(output_dir, "dataframe1.csv"), index=False)
+    generation_df.to_csv(os.path.join(output_dir, "dataframe2.csv"), index=False)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Generate synthetic energy datasets.")
+    parser.add_argument('--regions', type=int, default=len(states), help="number of states/regions")
+    parser.add_argument('--years', type=int, default=len(years), help="number of years")
+    parser.add_argument('--start-year', type=int, default=years[0])
+    parser.add_argument('--rows-per-year', type=int, default=1, help="rows per region and year (e.g. plant-level records)")
+    parser.add_argument('--freq', help="write a Timestamp row per region at this frequency (e.g. h, D) instead of yearly rows")
+    parser.add_argument('--plant-scale', type=float, default=1.0, help="multiplier on plant counts")
+    parser.add_argument('--seed', type=int, default=4, help="seed for reproducibility")
+    parser.add_argument('--output-dir', default="data")
+    args = parser.parse_args()
+
+    main_df, generation_df = generate(
+        args.regions, list(range(args.start_year, args.start_year + args.years)),
+        args.rows_per_year, args.plant_scale, args.seed, args.freq
+    )
+    save(main_df, generation_df, args.output_dir)
+
+    print(f"'dataframe1.csv' saved (no power columns, {len(main_df):,} rows)")
+    print(f"'dataframe2.csv' saved (only generation data, {len(generation_df):,} rows)")
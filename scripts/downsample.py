@@ -0,0 +1,66 @@
+#Imports
+import numpy as np
+
+# Largest-triangle-three-buckets downsampling of many series at once. The series are contiguous
+# [start, stop) slices of x and y; each one longer than `threshold` keeps its first and last points
+# plus one point per bucket in between, the point forming the largest triangle with the point kept
+# from the previous bucket and the mean of the next bucket. Buckets are processed in step across
+# all series, so the work is linear in the number of points rather than in series x buckets.
+# Returns the indices of the kept points, in order
+def lttb_indices(x, y, starts, stops, threshold):
+    if threshold < 3:
+        raise ValueError(f"LTTB keeps at least 3 points per series, got threshold {threshold}")
+    x = np.asarray(x, dtype='float64')
+    y = np.asarray(y, dtype='float64')
+    starts = np.asarray(starts, dtype=int)
+    stops = np.asarray(stops, dtype=int)
+    lengths = stops - starts
+    long = lengths > threshold
+    # Short series are kept whole
+    short_starts, short_lengths = starts[~long], lengths[~long]
+    kept = [ranges(short_starts, short_lengths)]
+
+    if long.any():
+        first, last, n = starts[long], stops[long] - 1, lengths[long]
+        buckets = threshold - 2
+        # Bucket b of a series covers [edges[:, b], edges[:, b + 1]) between its first and last points
+        every = (n - 2) / buckets
+        edges = first[:, None] + 1 + np.floor(np.arange(buckets + 1) * every[:, None]).astype(int)
+        edges[:, -1] = last
+
+        # Mean point of every bucket from running sums, plus the last point as the "next bucket" of the final one
+        cx = np.concatenate([[0.0], np.cumsum(x)])
+        cy = np.concatenate([[0.0], np.cumsum(y)])
+        counts = np.diff(edges, axis=1)
+        mean_x = (cx[edges[:, 1:]] - cx[edges[:, :-1]]) / counts
+        mean_y = (cy[edges[:, 1:]] - cy[edges[:, :-1]]) / counts
+        next_x = np.column_stack([mean_x[:, 1:], x[last]])
+        next_y = np.column_stack([mean_y[:, 1:], y[last]])
+
+        chosen = np.empty((len(first), threshold), dtype=int)
+        chosen[:, 0], chosen[:, -1] = first, last
+        previous = first
+        series = np.arange(len(first))
+        for b in range(buckets):
+            lo, count = edges[:, b], counts[:, b]
+            owner = np.repeat(series, count)
+            points = ranges(lo, count)
+            ax, ay = x[previous][owner], y[previous][owner]
+            bx, by = next_x[owner, b], next_y[owner, b]
+            # Twice the triangle area; the factor doesn't change which point is largest
+            area = np.abs((ax - bx) * (y[points] - ay) - (ax - x[points]) * (by - ay))
+            # First point with its series' largest area
+            offsets = np.concatenate([[0], np.cumsum(count)[:-1]])
+            best = area == np.maximum.reduceat(area, offsets)[owner]
+            _, first_best = np.unique(owner[best], return_index=True)
+            previous = points[np.flatnonzero(best)[first_best]]
+            chosen[:, b + 1] = previous
+        kept.append(chosen.ravel())
+
+    return np.sort(np.concatenate(kept))
+
+# Concatenated index ranges [start, start + length) for many starts at once
+def ranges(starts, lengths):
+    total = lengths.sum()
+    offsets = np.repeat(np.cumsum(lengths) - lengths, lengths)
+    return np.arange(total) - offsets + np.repeat(starts, lengths)
@@ -0,0 +1,195 @@
+#Imports
+import base64
+import gzip
+import json
+import os
+import re
+import numpy as np
+import plotly.io as pio
+
+# brotli is optional: without it only gzip artifacts can be produced
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+# Constants
+PLOTLYJS_SOURCE = True  # True inlines plotly.js; 'cdn', 'directory' (shared plotly.min.js next to the output) or a .js path
+COORD_PRECISION = 4     # decimals kept for lat/lon (~10 m)
+VALUE_PRECISION = 3     # decimals kept for chart values and per-point marker sizes/opacities
+TYPED_ARRAYS = True     # encode numeric arrays as base64 typed arrays
+COMPRESS = ()           # pre-compressed copies to write: 'gzip' and/or 'br'
+DETAIL_SUFFIX = "_detail"  # split output: per-state payloads go in <output name>_detail/ next to the page
+
+# Numeric data as a NumPy array (decoding plotly's base64 typed arrays), or None for anything else
+def numeric_array(values):
+    if isinstance(values, dict) and 'bdata' in values and 'shape' not in values:
+        return np.frombuffer(base64.b64decode(values['bdata']), dtype=values['dtype'])
+    if not isinstance(values, (list, tuple, np.ndarray)):
+        return None
+    arr = np.asarray(values)
+    return arr if arr.ndim == 1 and arr.dtype.kind in 'iuf' else None
+
+# Round one numeric array and pick its output encoding
+def compact_array(values, precision, typed_arrays):
+    arr = numeric_array(values)
+    if arr is None:
+        return values
+    if arr.dtype.kind == 'f' and precision is not None:
+        arr = arr.round(precision)
+        # Narrow to float32 when that still holds every value to the requested precision
+        narrowed = arr.astype(np.float32)
+        if typed_arrays and np.allclose(narrowed, arr, rtol=0, atol=0.5 * 10.0 ** -precision):
+            arr = narrowed
+    return encode_typed_array(arr) if typed_arrays else arr.tolist()
+
+# Encode an array as a plotly.js base64 typed array (plotly.js has no 64-bit integer type)
+def encode_typed_array(arr):
+    if arr.dtype.kind in 'iu':
+        arr = arr.astype(np.int32) if np.abs(arr).max(initial=0) < 2 ** 31 else arr.astype(np.float64)
+    arr = np.ascontiguousarray(arr, dtype=arr.dtype.newbyteorder('<'))
+    return {'dtype': arr.dtype.str[1:], 'bdata': base64.b64encode(arr.tobytes()).decode('ascii')}
+
+# Trace (or restyle properties) with coordinates and numeric arrays rounded for output
+def compact_trace(trace, coord_precision=COORD_PRECISION, value_precision=VALUE_PRECISION, typed_arrays=TYPED_ARRAYS):
+    trace = dict(trace)
+    for key in ('lat', 'lon'):
+        if key in trace:
+            trace[key] = compact_array(trace[key], coord_precision, typed_arrays)
+    # customdata is compacted only when numeric (cloud energies); state labels are left as they are
+    for key in ('x', 'y', 'customdata', 'marker.size', 'marker.opacity'):
+        if key in trace:
+            trace[key] = compact_array(trace[key], value_precision, typed_arrays)
+    if 'marker' in trace:
+        marker = trace['marker'] = dict(trace['marker'])
+        for key in ('size', 'opacity', 'color'):
+            if key in marker:
+                marker[key] = compact_array(marker[key], value_precision, typed_arrays)
+    return trace
+
+# Figure dict with coordinates and numeric arrays rounded for output (a figure dict passed in is left as is)
+def compact_figure(fig, coord_precision=COORD_PRECISION, value_precision=VALUE_PRECISION, typed_arrays=TYPED_ARRAYS):
+    fig_dict = dict(fig) if isinstance(fig, dict) else fig.to_dict()
+    fig_dict['data'] = [compact_trace(trace, coord_precision, value_precision, typed_arrays) for trace in fig_dict['data']]
+    return fig_dict
+
+# Write pre-compressed copies of a file next to it, returning their sizes by encoding
+def write_compressed(path, encodings):
+    with open(path, 'rb') as f:
+        data = f.read()
+    sizes = {}
+    for encoding in encodings:
+        if encoding == 'gzip':
+            compressed, suffix = gzip.compress(data, compresslevel=9, mtime=0), '.gz'
+        elif encoding == 'br':
+            if brotli is None:
+                print("brotli is not installed; skipping .br output")
+                continue
+            compressed, suffix = brotli.compress(data, quality=11), '.br'
+        else:
+            raise ValueError(f"Unknown compression: {encoding}")
+        with open(path + suffix, 'wb') as f:
+            f.write(compressed)
+        sizes[encoding] = len(compressed)
+    return sizes
+
+# Write the dashboard HTML in lean form, optionally (report) reporting the bytes saved against default
+# write_html output, which renders the page a second time
+def write_dashboard(fig, output_file, plotlyjs=PLOTLYJS_SOURCE, coord_precision=COORD_PRECISION,
+                    value_precision=VALUE_PRECISION, typed_arrays=TYPED_ARRAYS, compress=COMPRESS, report=False,
+                    post_script=None):
+    fig_dict = compact_figure(fig, coord_precision, value_precision, typed_arrays)
+    # The dict came from a validated figure or the fast path's plain dicts, so plotly can skip validating it
+    pio.write_html(fig_dict, output_file, include_plotlyjs=plotlyjs, validate=False, post_script=post_script)
+    sizes = {'output_bytes': os.path.getsize(output_file)}
+    for encoding, size in write_compressed(output_file, compress).items():
+        sizes[f'{encoding}_bytes'] = size
+    if report:
+        # Figure dicts are rendered as given, without building plotly's figure classes
+        default_html = pio.to_html(fig, include_plotlyjs=True, validate=not isinstance(fig, dict))
+        sizes['default_bytes'] = len(default_html.encode())
+        sizes['saved_bytes'] = sizes['default_bytes'] - sizes['output_bytes']
+    return sizes
+
+# Dashboard HTML as a string, in the same lean form write_dashboard writes
+def render_dashboard(fig, plotlyjs=PLOTLYJS_SOURCE, coord_precision=COORD_PRECISION, value_precision=VALUE_PRECISION,
+                     typed_arrays=TYPED_ARRAYS, post_script=None):
+    fig_dict = compact_figure(fig, coord_precision, value_precision, typed_arrays)
+    return pio.to_html(fig_dict, include_plotlyjs=plotlyjs, validate=False, post_script=post_script)
+
+# Figure JSON in the same lean form, for clients that plot it themselves
+def render_figure_json(fig, coord_precision=COORD_PRECISION, value_precision=VALUE_PRECISION, typed_arrays=TYPED_ARRAYS):
+    return pio.json.to_json_plotly(compact_figure(fig, coord_precision, value_precision, typed_arrays))
+
+# Split output: fetch a dropdown entry's detail payload when its button is clicked and restyle the
+# traces it names (by uid); entries without their own payload (toggles) load the default one
+DETAIL_LOADER_JS = """
+var gd = document.getElementById('{plot_id}');
+var payloadUrls = %(urls)s;
+var defaultUrl = %(default_url)s;
+var payloads = {};
+var current = null;
+var dtypes = {f4: Float32Array, f8: Float64Array, i1: Int8Array, i2: Int16Array, i4: Int32Array,
+              u1: Uint8Array, u2: Uint16Array, u4: Uint32Array};
+function decode(value) {
+    if (value === null || typeof value !== 'object' || !('bdata' in value)) return value;
+    var bytes = atob(value.bdata), buffer = new Uint8Array(bytes.length);
+    for (var i = 0; i < bytes.length; i++) buffer[i] = bytes.charCodeAt(i);
+    return Array.from(new dtypes[value.dtype](buffer.buffer));
+}
+function load(url) {
+    if (!(url in payloads)) payloads[url] = fetch(url).then(function(r) { return r.json(); });
+    return payloads[url];
+}
+function show(label) {
+    var url = payloadUrls[label] || defaultUrl;
+    current = url;
+    load(url).then(function(payload) {
+        if (url !== current) return;  // a later click has replaced this request
+        gd.data.forEach(function(trace, index) {
+            var props = payload[trace.uid];
+            if (!props) return;
+            var update = {};
+            Object.keys(props).forEach(function(key) { update[key] = [decode(props[key])]; });
+            Plotly.restyle(gd, update, [index]);
+        });
+    });
+}
+gd.on('plotly_buttonclicked', function(event) { show(event.button.label); });
+show(null);
+"""
+
+# File-name stem for one dropdown entry: "New Mexico" -> new_mexico
+def label_slug(label):
+    return re.sub(r'[^A-Za-z0-9]+', '_', label).strip('_').lower()
+
+# File name for one dropdown entry's detail payload
+def payload_name(label):
+    return label_slug(label) + ".json"
+
+# Write each detail payload as compact JSON, returning their total size in bytes
+def write_payloads(payloads, directory, coord_precision=COORD_PRECISION, value_precision=VALUE_PRECISION,
+                   typed_arrays=TYPED_ARRAYS):
+    os.makedirs(directory, exist_ok=True)
+    total = 0
+    for label, payload in payloads.items():
+        compact = {uid: compact_trace(props, coord_precision, value_precision, typed_arrays)
+                   for uid, props in payload.items()}
+        text = pio.json.to_json_plotly(compact)
+        with open(os.path.join(directory, payload_name(label)), 'w') as f:
+            f.write(text)
+        total += len(text.encode())
+    return total
+
+# Write an overview page plus per-state detail payloads (label -> {trace uid: restyle properties}) that the
+# page fetches when a dropdown entry is clicked; default_label's payload is loaded with the page
+def write_split_dashboard(fig, payloads, output_file, default_label, **options):
+    output_options = {k: v for k, v in options.items() if k in ('coord_precision', 'value_precision', 'typed_arrays')}
+    name = os.path.splitext(os.path.basename(output_file))[0] + DETAIL_SUFFIX
+    directory = os.path.join(os.path.dirname(output_file), name)
+    payload_bytes = write_payloads(payloads, directory, **output_options)
+    urls = {label: f"{name}/{payload_name(label)}" for label in payloads}
+    loader = DETAIL_LOADER_JS % {'urls': json.dumps(urls), 'default_url': json.dumps(urls[default_label])}
+    sizes = write_dashboard(fig, output_file, post_script=loader, **options)
+    sizes['payload_bytes'] = payload_bytes
+    return sizes
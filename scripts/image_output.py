@@ -0,0 +1,105 @@
+#Imports
+import json
+import os
+import plotly
+import plotly.io as pio
+from html_output import label_slug
+from result_cache import cache_key, cache_get, cache_put
+
+# kaleido is optional: without it only images already in the render cache can be exported
+try:
+    import kaleido
+except ImportError:
+    kaleido = None
+
+# Constants
+IMAGE_FORMATS = ('png',)  # any of 'png', 'jpg', 'webp', 'svg', 'pdf'
+IMAGE_WIDTH = 1600        # layout pixels; the height comes from the dashboard layout
+IMAGE_SCALE = 1.0         # below 1 for thumbnails, above for high-DPI reports
+IMAGE_SUFFIX = "_images"  # images go in <output name>_images/ next to the page
+
+# Set dotted restyle properties ('marker.size') on a copy of a trace
+def apply_props(trace, props):
+    trace = dict(trace)
+    for key, value in props.items():
+        *parents, leaf = key.split('.')
+        target = trace
+        for parent in parents:
+            target[parent] = dict(target.get(parent, {}))
+            target = target[parent]
+        target[leaf] = value
+    return trace
+
+# Static figure for one dropdown entry: the entry's visibility and point selection applied, hidden
+# traces dropped, split-output placeholders filled from its payload, and menus reduced to their labels
+def view_figure(fig_dict, menu_index, button_index, payload=None):
+    layout = fig_dict['layout']
+    button = layout['updatemenus'][menu_index]['buttons'][button_index]
+    restyle = button['args'][0]
+    data = []
+    for i, trace in enumerate(fig_dict['data']):
+        if not restyle['visible'][i]:
+            continue
+        trace = dict(trace, visible=True)
+        trace.pop('selectedpoints', None)
+        # Menus restyle selectedpoints only when some layer selects points by state
+        if restyle.get('selectedpoints') and restyle['selectedpoints'][i] is not None:
+            trace['selectedpoints'] = restyle['selectedpoints'][i]
+        if payload and trace.get('uid') in payload:
+            # A filled placeholder holds only this entry's points, so none of them is left unselected
+            trace.pop('selectedpoints', None)
+            trace = apply_props(trace, payload[trace['uid']])
+        data.append(trace)
+
+    # Button arguments are dropped: an image can't be clicked, and a closed dropdown only shows its active label
+    menus = []
+    for i, menu in enumerate(layout['updatemenus']):
+        if i == menu_index:
+            menus.append(dict(menu, buttons=[{'label': button['label'], 'method': 'skip'}], active=0))
+        else:
+            menus.append(dict(menu, buttons=[{'label': b['label'], 'method': 'skip'} for b in menu['buttons']]))
+    return {'data': data, 'layout': dict(layout, updatemenus=menus)}
+
+# Export one image per entry of the dropdown whose first entry is menu_label, in each format, to
+# <output name>_images/<entry>.<format>. Rendered images are cached under a hash of their view's figure
+# JSON, and every image missing from the cache is rendered in a single renderer session.
+# Returns image counts: written, rendered, served from the cache and skipped (no renderer)
+def export_images(fig, output_file, menu_label, formats=IMAGE_FORMATS, payloads=None, width=IMAGE_WIDTH,
+                  scale=IMAGE_SCALE, use_cache=True):
+    fig_dict = json.loads(pio.json.to_json_plotly(fig))
+    menus = fig_dict['layout']['updatemenus']
+    menu_index = next(i for i, menu in enumerate(menus) if menu['buttons'][0]['label'] == menu_label)
+    name = os.path.splitext(os.path.basename(output_file))[0] + IMAGE_SUFFIX
+    directory = os.path.join(os.path.dirname(output_file), name)
+    os.makedirs(directory, exist_ok=True)
+
+    counts = {'images': 0, 'rendered': 0, 'cached': 0, 'skipped': 0}
+    misses = []  # (key, view, path, format) still to render
+    for button_index, button in enumerate(menus[menu_index]['buttons']):
+        view = view_figure(fig_dict, menu_index, button_index, payloads and payloads.get(button['label']))
+        view_json = pio.json.to_json_plotly(view)
+        for fmt in formats:
+            path = os.path.join(directory, f"{label_slug(button['label'])}.{fmt}")
+            key = cache_key('image', view_json, fmt, width, scale, plotly.__version__)
+            image = cache_get(key) if use_cache else None
+            if image is None:
+                misses.append((key, view, path, fmt))
+                continue
+            with open(path, 'wb') as f:
+                f.write(image)
+            counts['cached'] += 1
+
+    if misses and kaleido is None:
+        print(f"kaleido is not installed; skipping {len(misses)} images not in the render cache")
+        counts['skipped'] = len(misses)
+    elif misses:
+        keys, views, paths, fmts = zip(*misses)
+        # One call renders every image in the same renderer session
+        pio.write_images(list(views), list(paths), format=list(fmts), width=width, scale=scale, validate=False)
+        if use_cache:
+            for key, path in zip(keys, paths):
+                with open(path, 'rb') as f:
+                    cache_put(key, f.read())
+        counts['rendered'] = len(misses)
+    counts['images'] = counts['rendered'] + counts['cached']
+    return counts
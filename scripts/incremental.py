@@ -0,0 +1,43 @@
+#Imports
+import hashlib
+import os
+import pandas as pd
+
+# Hash of the first `size` bytes of a file
+def prefix_hash(path, size):
+    digest = hashlib.sha256()
+    remaining = size
+    with open(path, 'rb') as f:
+        while remaining > 0:
+            block = f.read(min(1 << 20, remaining))
+            if not block:
+                break
+            digest.update(block)
+            remaining -= len(block)
+    return digest.hexdigest()
+
+# Byte offset and prefix hash of a file, recorded so rows appended later can be detected
+def file_checkpoint(path):
+    size = os.path.getsize(path)
+    ends_with_newline = False
+    if size:
+        with open(path, 'rb') as f:
+            f.seek(size - 1)
+            ends_with_newline = f.read(1) == b'\n'
+    return {'offset': size, 'prefix_sha256': prefix_hash(path, size), 'ends_with_newline': ends_with_newline}
+
+# Rows appended after a checkpoint as a list of CSV chunks, or None when the file was rewritten
+def read_appended_rows(path, checkpoint, dtypes, chunksize=None):
+    offset = checkpoint['offset']
+    size = os.path.getsize(path)
+    # Only a pure append keeps the checkpointed prefix byte-for-byte intact
+    if size < offset or not checkpoint['ends_with_newline'] or prefix_hash(path, offset) != checkpoint['prefix_sha256']:
+        return None
+    if size == offset:
+        return []
+    with open(path) as f:
+        header = f.readline().strip().split(',')
+    with open(path, 'rb') as f:
+        f.seek(offset)
+        reader = pd.read_csv(f, header=None, names=header, usecols=list(dtypes), dtype=dtypes, chunksize=chunksize)
+        return list(reader) if chunksize else [reader]
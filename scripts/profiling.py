@@ -0,0 +1,92 @@
+#Imports
+import functools
+import sys
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+
+# resource is Unix-only: without it the report has no peak resident memory
+try:
+    import resource
+except ImportError:
+    resource = None
+
+# Phase timings of the running build, keyed by phase name; None while profiling is off
+PHASES = None
+TOTAL_PHASES = ('build_layout', 'build_split_layout', 'write_html')  # phases making up a build's total time
+PHASES_LOCK = threading.Lock()  # phases of a concurrent build finish on several threads
+
+# Start collecting phase timings, and traced memory unless trace_memory is False (it slows the build)
+def start_profile(trace_memory=True):
+    global PHASES
+    PHASES = {}
+    if trace_memory:
+        tracemalloc.start()
+
+# Time a block as a named phase (calls of the same phase are summed, so phases that overlap in a
+# concurrent build can add up to more than the build's wall time)
+@contextmanager
+def phase(name):
+    if PHASES is None:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - start
+        with PHASES_LOCK:
+            entry = PHASES.setdefault(name, {'seconds': 0.0, 'calls': 0})
+            entry['seconds'] += elapsed
+            entry['calls'] += 1
+
+# Decorator timing every call of a function as a phase named after it
+def profiled(func):
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        with phase(func.__name__):
+            return func(*args, **kwargs)
+    return wrapper
+
+# Number of points in a trace (map points, or x values for charts)
+def trace_points(trace):
+    for key in ('lat', 'x'):
+        values = trace[key] if key in trace else None
+        if values is not None:
+            return len(values)
+    return 0
+
+# Stop profiling and build the report: phases, trace and point counts, memory and output size
+def finish_profile(fig, sizes=None):
+    global PHASES
+    traced_peak = None
+    if tracemalloc.is_tracing():
+        _, traced_peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+    # ru_maxrss is in kilobytes on Linux and bytes on macOS
+    max_rss = None
+    if resource is not None:
+        max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * (1 if sys.platform == 'darwin' else 1024)
+
+    # Figure objects and fast-path figure dicts both index their traces by key
+    data = fig['data'] if isinstance(fig, dict) else fig.data
+    traces_by_type = {}
+    points_by_type = {}
+    for trace in data:
+        traces_by_type[trace['type']] = traces_by_type.get(trace['type'], 0) + 1
+        points_by_type[trace['type']] = points_by_type.get(trace['type'], 0) + trace_points(trace)
+
+    report = {
+        'phases': {name: {'seconds': round(e['seconds'], 6), 'calls': e['calls']} for name, e in PHASES.items()},
+        'total_seconds': round(sum(e['seconds'] for name, e in PHASES.items() if name in TOTAL_PHASES), 6),
+        'trace_count': len(data),
+        'traces_by_type': traces_by_type,
+        'point_count': sum(points_by_type.values()),
+        'points_by_type': points_by_type,
+        'peak_traced_bytes': traced_peak,
+        'max_rss_bytes': max_rss,
+        'output': sizes or {},
+    }
+    PHASES = None
+    return report
@@ -0,0 +1,67 @@
+#Imports
+import hashlib
+import os
+import pickle
+import threading
+
+# Constants
+RESULT_CACHE_DIR = "data/.cache/results"
+RESULT_CACHE_MAX_BYTES = 256 * 1024 * 1024  # LRU entries are evicted beyond this size
+
+# Cache key from any number of string-convertible parts
+def cache_key(*parts):
+    return hashlib.sha256("\x1f".join(str(p) for p in parts).encode()).hexdigest()
+
+# Path of the entry stored under a key
+def entry_path(key):
+    return os.path.join(RESULT_CACHE_DIR, key + ".pkl")
+
+# Load a cached value, or None on a miss; hits are touched so eviction is least-recently-used
+def cache_get(key):
+    path = entry_path(key)
+    try:
+        with open(path, 'rb') as f:
+            value = pickle.load(f)
+    except (FileNotFoundError, EOFError, pickle.UnpicklingError):
+        return None
+    os.utime(path)
+    return value
+
+# Store a value under a key, then evict old entries over the size budget
+def cache_put(key, value):
+    os.makedirs(RESULT_CACHE_DIR, exist_ok=True)
+    path = entry_path(key)
+    tmp_path = f"{path}.{os.getpid()}-{threading.get_ident()}.tmp"
+    with open(tmp_path, 'wb') as f:
+        pickle.dump(value, f, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(tmp_path, path)
+    evict(RESULT_CACHE_MAX_BYTES)
+
+# Return the cached value for a key, computing and storing it on a miss
+def cached(key, compute):
+    value = cache_get(key)
+    if value is None:
+        value = compute()
+        cache_put(key, value)
+    return value
+
+# Delete least-recently-used entries until the cache fits in max_bytes
+def evict(max_bytes):
+    entries = []
+    for entry in os.scandir(RESULT_CACHE_DIR):
+        if entry.name.endswith(".pkl"):
+            # Another process or thread may evict the same entry while this one scans
+            try:
+                st = entry.stat()
+            except FileNotFoundError:
+                continue
+            entries.append((st.st_mtime_ns, st.st_size, entry.path))
+    total = sum(size for _, size, _ in entries)
+    for _, size, path in sorted(entries):
+        if total <= max_bytes:
+            break
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+        total -= size
@@ -0,0 +1,165 @@
+#Imports
+import time
+START = time.perf_counter()  # startup is measured from here, before the heavy imports
+import argparse
+import threading
+from collections import OrderedDict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit, parse_qs
+from plotly.offline import get_plotlyjs
+import viz
+from cli import parse_states, parse_years
+from html_output import render_dashboard, render_figure_json
+
+# Constants
+HOST = "127.0.0.1"
+PORT = 8050
+CACHE_ENTRIES = 32  # filtered dashboards kept in memory
+PLOTLYJS_PATH = "/plotly.min.js"  # pages load plotly.js from the server instead of inlining it
+
+# Least-recently-used cache of built dashboards keyed by filter parameters
+class LRUCache:
+    def __init__(self, max_entries=CACHE_ENTRIES):
+        self.max_entries = max_entries
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+
+    # Entry for a key, marked as most recently used (None when missing)
+    def get(self, key):
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is not None:
+                self.entries.move_to_end(key)
+            return entry
+
+    # Store an entry, evicting the least recently used ones beyond max_entries
+    def put(self, key, entry):
+        with self.lock:
+            self.entries[key] = entry
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+
+# Parse ?states=A,B&years=2020-2023 (or years=2021) into a cache key: (sorted states or None, (first, last) or None)
+def parse_filters(query, known_states):
+    params = parse_qs(query)
+    states = None
+    if params.get('states'):
+        states = sorted({state for value in params['states'] for state in parse_states(value)})
+        unknown = [s for s in states if s not in known_states]
+        if unknown:
+            raise ValueError(f"Unknown states: {', '.join(unknown)}")
+        states = tuple(states)
+    years = None
+    if params.get('years'):
+        try:
+            years = parse_years(params['years'][-1])
+        except ValueError:
+            raise ValueError(f"Invalid years: {params['years'][-1]} (expected YEAR or FIRST-LAST)")
+    return states, years
+
+# Dashboard server: the datasets are aggregated once into the unified frame and built dashboards
+# are kept in an LRU cache
+class DashboardServer(ThreadingHTTPServer):
+    def __init__(self, address, frame, cache_entries=CACHE_ENTRIES):
+        super().__init__(address, DashboardHandler)
+        self.frame = frame
+        self.known_states = set(frame.index.get_level_values('State'))
+        self.cache = LRUCache(cache_entries)
+        # Builds share the persisted point store, so they run one at a time; cache hits don't wait
+        self.build_lock = threading.Lock()
+        self.plotlyjs = get_plotlyjs().encode()
+        self.startup_s = None
+
+    # Cached entry for the filters, building the dashboard on a miss; returns (entry, hit, build seconds)
+    def dashboard(self, key):
+        entry = self.cache.get(key)
+        if entry is not None:
+            return entry, True, 0.0
+        with self.build_lock:
+            # Another request may have built it while this one waited
+            entry = self.cache.get(key)
+            if entry is not None:
+                return entry, True, 0.0
+            start = time.perf_counter()
+            entry = {'figure': viz.build_dashboard(self.frame, *key), 'bodies': {}}
+            build_s = time.perf_counter() - start
+            self.cache.put(key, entry)
+        return entry, False, build_s
+
+# Request handler: / serves the dashboard page, /figure.json the figure, both filtered by the query
+class DashboardHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        start = time.perf_counter()
+        url = urlsplit(self.path)
+        if url.path == PLOTLYJS_PATH:
+            self.respond(200, 'application/javascript', self.server.plotlyjs, start, cache='static')
+            return
+        if url.path not in ('/', '/figure.json'):
+            self.respond(404, 'text/plain', b"Not found\n", start)
+            return
+        try:
+            key = parse_filters(url.query, self.server.known_states)
+        except ValueError as e:
+            self.respond(400, 'text/plain', f"{e}\n".encode(), start)
+            return
+
+        entry, hit, build_s = self.server.dashboard(key)
+        # Each response body is rendered once per cached figure
+        render_start = time.perf_counter()
+        body = entry['bodies'].get(url.path)
+        if body is None:
+            if url.path == '/':
+                body = render_dashboard(entry['figure'], plotlyjs=PLOTLYJS_PATH).encode()
+            else:
+                body = render_figure_json(entry['figure']).encode()
+            entry['bodies'][url.path] = body
+        render_s = time.perf_counter() - render_start
+        content_type = 'text/html; charset=utf-8' if url.path == '/' else 'application/json'
+        self.respond(200, content_type, body, start, cache='hit' if hit else 'miss', build_s=build_s,
+                     render_s=render_s)
+
+    # Send a response with startup and per-request timings in its headers
+    def respond(self, status, content_type, body, start, cache=None, build_s=0.0, render_s=0.0):
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        if cache is not None:
+            self.send_header('X-Cache', cache)
+        self.send_header('X-Startup-Seconds', f"{self.server.startup_s:.3f}")
+        total_ms = (time.perf_counter() - start) * 1000
+        self.send_header('Server-Timing', f"build;dur={build_s * 1000:.1f}, render;dur={render_s * 1000:.1f}, "
+                                          f"total;dur={total_ms:.1f}")
+        self.end_headers()
+        self.wfile.write(body)
+
+# Load both datasets once and start serving
+def serve(host=HOST, port=PORT, cache_entries=CACHE_ENTRIES, validated=False):
+    # Builds take the figure-dict fast path unless the validated path is asked for
+    viz.FAST_PATH = not validated
+    try:
+        frame = viz.read_frame(viz.DATA_FILE, viz.GENERATION_FILE)
+    except FileNotFoundError as e:
+        print(f"File not found: {e.filename}")
+        raise SystemExit(1)
+    server = DashboardServer((host, port), frame, cache_entries)
+    server.startup_s = time.perf_counter() - START
+    print(f"Serving dashboards on http://{host}:{server.server_port}/ (startup {server.startup_s:.2f}s)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+# Entry point: serve filtered dashboards, e.g. /?states=Texas,Iowa&years=2021-2023
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Serve filtered dashboards over HTTP.")
+    parser.add_argument('--host', default=HOST)
+    parser.add_argument('--port', type=int, default=PORT)
+    parser.add_argument('--cache-entries', type=int, default=CACHE_ENTRIES,
+                        help="filtered dashboards kept in memory")
+    parser.add_argument('--validated', action='store_true',
+                        help="build through plotly's validated figure path instead of the fast path")
+    args = parser.parse_args()
+    serve(args.host, args.port, args.cache_entries, args.validated)
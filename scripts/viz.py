@@ -1,16 +1,105 @@
 
+# Entry point: the command line lives in cli.py. Running this file hands over to it before pandas or plotly
+# load; cli imports this module as `viz` when a build needs it, so the build modules load once
+if __name__ == "__main__":
+    import sys
+    import cli
+    sys.exit(cli.main())
+
 #Imports
 import pandas as pd
-import plotly.graph_objects as go
+import plotly
+import plotly.io as pio
 import numpy as np
-from plotly.colors import qualitative
+from plotly.colors import qualitative, get_colorscale
 import sys
-from plotly.subplots import make_subplots
+import json
+from config import DATA_FILE, GENERATION_FILE, MAIN_COLUMNS, GENERATION_COLUMNS, TIME_COLUMN
+from columnar_cache import read_csv_cached, file_hash, source_hash
+from result_cache import cache_key, cache_get, cache_put, cached
+from incremental import file_checkpoint, read_appended_rows
+from html_output import numeric_array
+from coords import point_samples
+from downsample import lttb_indices
+from profiling import profiled
+import copy
+import functools
+import os
+from concurrent.futures import ThreadPoolExecutor
 
 # Constants
-DATA_FILE = "data/dataframe1.csv"
-GENERATION_FILE = "data/dataframe2.csv"
-OUTPUT_FILE = "outputs/golden_image.html"
+# Rows per chunk for streaming ingestion (None reads each file in one pass)
+CHUNK_SIZE = None
+
+# Read inputs through the columnar (Arrow) cache instead of re-parsing CSV text every run
+USE_COLUMNAR_CACHE = True
+
+# Reuse aggregates, traces and the built figure from the on-disk cache when inputs are unchanged
+USE_RESULT_CACHE = True
+
+# Merge rows appended since the last build into stored aggregates and traces instead of rebuilding
+INCREMENTAL = False
+
+# Persist generated map points (data/.cache/points) so later runs reuse identical positions
+PERSIST_POINTS = True
+
+# Upper bound on generation cloud points across all states and years
+CLOUD_POINT_BUDGET = 20_000
+
+# Generation clouds per state and year ('per_year') or one per state over all years ('aggregated')
+CLOUD_MODE = 'per_year'
+
+# Assemble the figure as a plain dict (subplot references resolved once) instead of through
+# plotly's validated make_subplots/add_trace/update_layout calls
+FAST_PATH = False
+
+# Read both inputs and build independent trace layers on a thread pool (pandas parsing and most
+# NumPy work release the GIL); results are collected in a fixed order, so the output is the same
+CONCURRENT_BUILD = False
+
+# Write an overview page (bubbles and bars) plus per-state detail payloads (map points and the
+# line chart) that the page loads when a state is selected, instead of embedding every state's traces
+SPLIT_OUTPUT = False
+
+# Map layers whose points, and the line chart, are moved into per-state payloads on split output
+DETAIL_LAYERS = ['solar_plants', 'wind_plants', 'solar_clouds', 'wind_clouds']
+ALL_STATES = "All States"
+
+# Line chart colors, assigned to states in order of first appearance
+LINE_COLORS = qualitative.Plotly + qualitative.Dark24 + qualitative.Light24
+
+# Line chart: one trace per state ('per_state'), or every state in one trace separated by NaN gaps
+# ('combined'), which keeps the figure to a single line trace with thousands of regions
+LINE_MODE = 'per_state'
+
+# Timestamped inputs are summed per state and period at this resolution (a pandas period alias such
+# as 'h', 'D', 'W' or 'M'), which the sales trend is drawn at; None sums them per year only
+TIME_RESOLUTION = 'D'
+
+# Most points drawn per state in the sales trend; longer series are downsampled with LTTB
+LINE_POINTS_PER_STATE = 1_000
+
+# Power bar chart: one bar per state ('state'), or per state with years stacked ('year')
+BAR_GROUPING = 'state'
+
+# Metrics summed per (State, Year)
+MAIN_METRICS = ['Sales', 'Profit', 'Solar_Plants', 'Wind_Plants', 'Discount']
+GENERATION_METRICS = ['Solar_Generation_MWh', 'Wind_Generation_MWh']
+
+# Columns of the unified per-(State, Year) frame: main sums, main row count, generation sums
+FRAME_COLUMNS = MAIN_METRICS + ['Rows'] + GENERATION_METRICS
+
+# Dtypes used when streaming the input files; their keys are the columns read. Only the keys are compact:
+# metrics stay float64, so streamed and incremental sums differ from a single-pass read only by the
+# rounding of adding chunk totals in another order (float32 was off from the 7th significant digit)
+MAIN_DTYPES = {
+    'State': 'category', 'Year': 'int16', 'Sales': 'float64', 'Profit': 'float64',
+    'Discount': 'float64', 'Solar_Plants': 'float64', 'Wind_Plants': 'float64'
+}
+GENERATION_DTYPES = {
+    'State': 'category', 'Year': 'int16',
+    'Solar_Generation_MWh': 'float64', 'Wind_Generation_MWh': 'float64'
+}
 
 # Color constants
 SOLAR_COLOR = '#FF0000'
@@ -35,242 +124,623 @@ STATE_COORDS = {
     'Texas': {'lat': 31.0, 'lon': -99.0, 'lat_range': 4, 'lon_range': 5},
 }
 
-# Load and preprocess main data
-def load_data():
+# Header row of a CSV input
+def read_header(path):
+    with open(path) as f:
+        return f.readline().strip().split(',')
+
+# Columns to read from an input: timestamped files have TIME_COLUMN in place of Year
+def input_columns(path, columns):
+    if TIME_COLUMN not in read_header(path):
+        return columns
+    return [TIME_COLUMN if column == 'Year' else column for column in columns]
+
+# Streaming dtypes for an input, with timestamps read as text and parsed during aggregation
+def input_dtypes(path, dtypes):
+    if TIME_COLUMN not in read_header(path):
+        return dtypes
+    return {(TIME_COLUMN if column == 'Year' else column): ('str' if column == 'Year' else dtype)
+            for column, dtype in dtypes.items()}
+
+# Read one input file, through the columnar cache when enabled
+def read_input(path, columns):
+    columns = input_columns(path, columns)
+    if USE_COLUMNAR_CACHE:
+        return read_csv_cached(path, columns)
+    return pd.read_csv(path, usecols=columns)
+
+# Load main data as per-(State, Year) totals
+@profiled
+def load_data(chunksize=None):
+    if chunksize:
+        return load_data_streaming(chunksize)
     try:
-        df = pd.read_csv(DATA_FILE)
+        df = read_input(DATA_FILE, MAIN_COLUMNS)
     except FileNotFoundError:
         print(f"File not found: {DATA_FILE}")
         sys.exit(1)
-    # Aggregate metrics by state
-    state_summary = df.groupby('State').agg({
-        'Sales': 'sum',
-        'Profit': 'sum',
-        'Solar_Plants': 'mean',
-        'Wind_Plants': 'mean',
-        'Discount': 'mean'
-    }).reset_index()
-    # Compute total plant count
-    state_summary['Total_Plants'] = state_summary['Solar_Plants'] + state_summary['Wind_Plants']
-    # Prepare yearly sales data
-    yearly = df.groupby(['Year', 'State']).agg({'Sales': 'sum'}).reset_index()
-    # Extract dashboard metrics
-    stats = {
-        'metric1': int(df['Sales'].sum()),
-        'metric2': int(df['Profit'].sum()),
-        'metric3': round(df['Discount'].mean() * 100, 1)
-    }
-    return df, state_summary, yearly, stats
+    # The row-level frame is dropped once it's aggregated
+    return aggregate_main_chunk(df)
 
-# Load generation data (solar/wind in MWh)
-def load_generation_data():
+# Open a CSV as an iterator of compact-dtype chunks
+def read_csv_chunks(path, dtypes, chunksize):
     try:
-        df_gen = pd.read_csv(GENERATION_FILE)
+        dtypes = input_dtypes(path, dtypes)
+        return pd.read_csv(path, dtype=dtypes, usecols=list(dtypes), chunksize=chunksize)
+    except FileNotFoundError:
+        print(f"File not found: {path}")
+        sys.exit(1)
+
+# Fold a chunk's partial aggregates into the running totals
+def accumulate(total, partial):
+    return partial if total is None else total.add(partial, fill_value=0)
+
+# Grouping keys of an input chunk: State and Year, plus each row's period start at TIME_RESOLUTION
+# for timestamped inputs (their Year comes from the timestamp)
+def group_keys(chunk):
+    if TIME_COLUMN not in chunk:
+        return [chunk['State'], chunk['Year']]
+    time = pd.to_datetime(chunk[TIME_COLUMN])
+    keys = [chunk['State'], time.dt.year.rename('Year')]
+    if TIME_RESOLUTION:
+        keys.append(time.dt.to_period(TIME_RESOLUTION).dt.start_time.rename('Time'))
+    return keys
+
+# Per-(State, Year) sums of the main metrics plus the number of rows behind them
+def aggregate_main_chunk(chunk):
+    # Sum in float64 so large totals don't lose precision
+    values = chunk[MAIN_METRICS].astype('float64').assign(Rows=1)
+    return values.groupby(group_keys(chunk), observed=True).sum()
+
+# Stream main data in chunks, keeping only running per-(State, Year) totals
+def load_data_streaming(chunksize):
+    totals = None
+    for chunk in read_csv_chunks(DATA_FILE, MAIN_DTYPES, chunksize):
+        totals = accumulate(totals, aggregate_main_chunk(chunk))
+    # The full frame is never materialized in streaming mode
+    return totals
+
+# Load generation data (solar/wind in MWh) as per-(State, Year) totals
+@profiled
+def load_generation_data(chunksize=None):
+    if chunksize:
+        return load_generation_data_streaming(chunksize)
+    try:
+        df_gen = read_input(GENERATION_FILE, GENERATION_COLUMNS)
     except FileNotFoundError:
         print(f"File not found: {GENERATION_FILE}")
         sys.exit(1)
-    return df_gen
-
-# Generate random plant coordinates within bounding box
-def generate_random_coords(state, num, typ):
-    if state not in STATE_COORDS:
-        return [], []
-    box = STATE_COORDS[state]
-    np.random.seed(hash(state + typ) % 2**32)  # Ensure reproducibility per state/type
-    lat = np.random.uniform(box['lat'] - box['lat_range'], box['lat'] + box['lat_range'], int(num))
-    lon = np.random.uniform(box['lon'] - box['lon_range'], box['lon'] + box['lon_range'], int(num))
-    return lat, lon
+    return aggregate_generation_chunk(df_gen)
 
-# Create plant marker traces (solar & wind)
-def create_map_traces_per_state(state_df):
-    solar_traces = []
-    wind_traces = []
-    for _, row in state_df.iterrows():
-        state = row['State']
-        solar_lat, solar_lon, solar_text = [], [], []
-        wind_lat, wind_lon, wind_text = [], [], []
-
-        # Solar marker positions
-        if row['Solar_Plants'] > 0:
-            lat, lon = generate_random_coords(state, row['Solar_Plants'], 'solar')
-            solar_lat.extend(lat)
-            solar_lon.extend(lon)
-            solar_text.extend([f"{state} - Solar Plant"] * len(lat))
-
-        # Wind marker positions
-        if row['Wind_Plants'] > 0:
-            lat, lon = generate_random_coords(state, row['Wind_Plants'], 'wind')
-            wind_lat.extend(lat)
-            wind_lon.extend(lon)
-            wind_text.extend([f"{state} - Wind Plant"] * len(lat))
-
-        # Add solar markers
-        if solar_lat:
-            solar_traces.append(go.Scattergeo(
-                lon=solar_lon, lat=solar_lat, text=solar_text,
-                mode='markers',
-                marker=dict(size=8, color=SOLAR_COLOR, opacity=0.85),
-                name=f"Solar Plants - {state}",
-                hovertemplate='<b>%{text}</b><extra></extra>',
-                visible=True,
-                showlegend=False
-            ))
+# Partial per-(State, Year) generation sums of one chunk
+def aggregate_generation_chunk(chunk):
+    values = chunk[GENERATION_METRICS].astype('float64')
+    return values.groupby(group_keys(chunk), observed=True).sum()
 
-        # Add wind markers
-        if wind_lat:
-            wind_traces.append(go.Scattergeo(
-                lon=wind_lon, lat=wind_lat, text=wind_text,
-                mode='markers',
-                marker=dict(size=8, color=WIND_COLOR, opacity=0.85),
-                name=f"Wind Plants - {state}",
-                hovertemplate='<b>%{text}</b><extra></extra>',
-                visible=True,
-                showlegend=False
-            ))
-    return solar_traces, wind_traces
+# Stream generation data in chunks, summing it to one row per state and year
+def load_generation_data_streaming(chunksize):
+    totals = None
+    for chunk in read_csv_chunks(GENERATION_FILE, GENERATION_DTYPES, chunksize):
+        totals = accumulate(totals, aggregate_generation_chunk(chunk))
+    return totals
 
-# Create generation clouds per state (proportional to energy)
-def create_generation_clouds_per_state(df_gen):
-    solar_cloud_traces = []
-    wind_cloud_traces = []
-    scale_points_per_1000 = 0.05  # Scale energy to number of points
-    np.random.seed(42)
+# Totals re-indexed on plain (State, Year[, Time]) levels, so totals from different files and chunks align
+def plain_index(totals):
+    levels = [totals.index.get_level_values(0).astype(str), totals.index.get_level_values(1).astype('int64')]
+    if totals.index.nlevels == 3:
+        levels.append(pd.DatetimeIndex(totals.index.get_level_values(2)))
+    return totals.set_axis(pd.MultiIndex.from_arrays(levels, names=['State', 'Year', 'Time'][:len(levels)]))
 
-    for _, row in df_gen.iterrows():
-        state = row['State']
-        if state not in STATE_COORDS:
-            continue
-        box = STATE_COORDS[state]
-        solar_energy = row['Solar_Generation_MWh']
-        wind_energy = row['Wind_Generation_MWh']
-        total_energy = solar_energy + wind_energy
-        if total_energy <= 0:
-            continue
+# Unified data model: one row per (State, Year) with both inputs' sums and the main row count, joined
+# on the shared key and sorted so each state's years are contiguous. Combinations missing from one
+# input have NaN sums for its columns (and 0 Rows). Timestamped inputs add a Time level of periods
+# within each year; joined with a yearly input, they are summed per year first
+def build_frame(main_totals=None, generation_totals=None):
+    parts = [plain_index(totals) for totals in (main_totals, generation_totals) if totals is not None]
+    if len({part.index.nlevels for part in parts}) > 1:
+        parts = [part.groupby(level=['State', 'Year']).sum() if part.index.nlevels == 3 else part
+                 for part in parts]
+    frame = parts[0].join(parts[1], how='outer', sort=True) if len(parts) == 2 else parts[0].sort_index()
+    frame = frame.reindex(columns=FRAME_COLUMNS)
+    frame['Rows'] = frame['Rows'].fillna(0).astype('int32')
+    return frame
 
-        total_points = int(total_energy * scale_points_per_1000)
-        total_points = max(10, min(total_points, 150))  # Clamp to range
-        solar_ratio = solar_energy / total_energy
-        wind_ratio = wind_energy / total_energy
+# Run independent calls and return their results in call order, concurrently in concurrent build mode
+def run_all(*calls):
+    if not CONCURRENT_BUILD:
+        return [call() for call in calls]
+    # A pool per group, so a call running on a pool thread can start its own group without waiting on it
+    with ThreadPoolExecutor(max_workers=len(calls)) as pool:
+        futures = [pool.submit(call) for call in calls]
+        return [future.result() for future in futures]
 
-        # Split point count by energy type
-        solar_points_count = int(total_points * solar_ratio)
-        wind_points_count = total_points - solar_points_count
+# Load both inputs into the unified frame
+def load_frame(chunksize=None):
+    return build_frame(*run_all(lambda: load_data(chunksize), lambda: load_generation_data(chunksize)))
 
-        # Generate cloud points
-        solar_lats = np.random.uniform(box['lat'] - box['lat_range'], box['lat'] + box['lat_range'], solar_points_count)
-        solar_lons = np.random.uniform(box['lon'] - box['lon_range'], box['lon'] + box['lon_range'], solar_points_count)
-        solar_texts = [f"{state} - Solar Generation Cloud<br>Energy: {solar_energy:,} MWh"] * solar_points_count
+# Unified frame from two input files read whole, for callers building many dashboards from one load
+def read_frame(data_file, generation_file):
+    return build_frame(*run_all(
+        lambda: aggregate_main_chunk(read_input(data_file, MAIN_COLUMNS)),
+        lambda: aggregate_generation_chunk(read_input(generation_file, GENERATION_COLUMNS)),
+    ))
 
-        wind_lats = np.random.uniform(box['lat'] - box['lat_range'], box['lat'] + box['lat_range'], wind_points_count)
-        wind_lons = np.random.uniform(box['lon'] - box['lon_range'], box['lon'] + box['lon_range'], wind_points_count)
-        wind_texts = [f"{state} - Wind Generation Cloud<br>Energy: {wind_energy:,} MWh"] * wind_points_count
+# Frame rows backed by main data
+def main_rows(frame):
+    return frame[frame['Rows'] > 0]
+
+# States with main data, in frame (sorted) order
+def main_states(frame):
+    return main_rows(frame).index.get_level_values('State').unique().tolist()
+
+# State-level summary view: Sales and Profit totals, per-row means of plants and discount
+def state_summary(frame):
+    main = main_rows(frame)
+    sums = main[MAIN_METRICS].groupby(level='State', sort=True).sum()
+    rows = main['Rows'].groupby(level='State', sort=True).sum()
+    summary = pd.DataFrame({
+        'Sales': sums['Sales'].round().astype('int64'),
+        'Profit': sums['Profit'].round().astype('int64'),
+        'Solar_Plants': sums['Solar_Plants'] / rows,
+        'Wind_Plants': sums['Wind_Plants'] / rows,
+        'Discount': sums['Discount'] / rows,
+    })
+    # Compute total plant count
+    summary['Total_Plants'] = summary['Solar_Plants'] + summary['Wind_Plants']
+    return summary.rename_axis('State').reset_index()
+
+# Sales trend view: total Sales per (State, Year), or per (State, Year, Time) period, with main data
+def sales_trend(frame):
+    return main_rows(frame)['Sales'].round().astype('int64')
+
+# Generation view: per-(State, Year) energy sums where there is generation data
+def generation_frame(frame):
+    gen = frame[GENERATION_METRICS]
+    if 'Time' in frame.index.names:
+        gen = gen.groupby(level=['State', 'Year'], sort=False).sum(min_count=1)
+    return gen.dropna(how='all').fillna(0)
+
+# State bounding boxes as a frame for vectorized lookups
+STATE_BOXES = pd.DataFrame.from_dict(STATE_COORDS, orient='index')
+
+# Place a batch of points within their states' bounding boxes from unit samples in [0, 1)
+def generate_random_coords(point_states, units):
+    box = STATE_BOXES.loc[point_states]
+    lat = box['lat'].to_numpy() + box['lat_range'].to_numpy() * (2 * units[:, 0] - 1)
+    lon = box['lon'].to_numpy() + box['lon_range'].to_numpy() * (2 * units[:, 1] - 1)
+    return lat, lon
 
-        # Add clouds with random size and opacity
-        solar_cloud_traces.append(go.Scattergeo(
-            lon=solar_lons, lat=solar_lats, text=solar_texts,
+# Create plant marker traces (solar & wind), one trace per layer with the state stored per point
+@profiled
+def create_map_traces_per_state(state_df):
+    state_df = state_df[state_df['State'].isin(STATE_BOXES.index)]
+    states = state_df['State'].to_numpy()
+    traces = []
+    for typ, column, color in [('Solar', 'Solar_Plants', SOLAR_COLOR), ('Wind', 'Wind_Plants', WIND_COLOR)]:
+        counts = state_df[column].clip(lower=0).astype(int).to_numpy()
+        point_states = np.repeat(states, counts)
+        # Each state/type has its own stable generator, so points don't move between runs
+        keys = [f"{state}|{typ.lower()}-plant" for state in states]
+        units = point_samples(keys, counts, PERSIST_POINTS)
+        lat, lon = generate_random_coords(point_states, units)
+        traces.append(dict(
+            type='scattergeo',
+            lon=lon, lat=lat, customdata=point_states,
+            mode='markers',
+            marker=dict(size=8, color=color, opacity=0.85),
+            name=f"{typ} Plants",
+            hovertemplate=f'<b>%{{customdata}} - {typ} Plant</b><extra></extra>',
+            visible=True,
+            showlegend=False
+        ))
+    return traces[0], traces[1]
+
+# Split a point budget across rows in proportion to their weights (largest remainder)
+def apportion(weights, budget):
+    share = weights / weights.sum() * budget
+    counts = np.floor(share).astype(int)
+    leftover = budget - counts.sum()
+    counts[np.argsort(counts - share)[:leftover]] += 1
+    return counts
+
+# Density summary for clouds over budget: one marker per state and type, sized by its energy
+def create_cloud_summary_traces(gen):
+    totals = gen.groupby(level='State', sort=True)[GENERATION_METRICS].sum()
+    box = STATE_BOXES.loc[totals.index]
+    traces = []
+    for typ, column, color in [('Solar', 'Solar_Generation_MWh', SOLAR_COLOR),
+                               ('Wind', 'Wind_Generation_MWh', WIND_COLOR)]:
+        energy = totals[column].to_numpy()
+        traces.append(dict(
+            type='scattergeo',
+            lon=box['lon'].to_numpy(), lat=box['lat'].to_numpy(),
+            customdata=np.column_stack([totals.index.to_numpy(dtype=object), energy]),
             mode='markers',
-            marker=dict(size=18 + 4 * np.random.rand(solar_points_count),
-                        color=SOLAR_COLOR,
-                        opacity=0.5 + 0.3 * np.random.rand(solar_points_count)),
-            name=f"Solar Clouds - {state}",
-            hovertemplate='%{text}<extra></extra>',
+            marker=dict(size=10 + 40 * np.sqrt(energy / max(energy.max(initial=0), 1)),
+                        color=color, opacity=0.6),
+            name=f"{typ} Clouds",
+            hovertemplate=f'%{{customdata[0]}} - {typ} Generation<br>Energy: %{{customdata[1]:,}} MWh<extra></extra>',
             visible=False,
             showlegend=False
         ))
+    return traces[0], traces[1]
+
+# Create generation clouds (proportional to energy), one trace per layer, within a global point budget
+@profiled
+def create_generation_clouds_per_state(gen, budget=None, mode=None):
+    scale_points_per_1000 = 0.05  # Scale energy to number of points
+    budget = CLOUD_POINT_BUDGET if budget is None else budget
+    mode = mode or CLOUD_MODE
 
-        wind_cloud_traces.append(go.Scattergeo(
-            lon=wind_lons, lat=wind_lats, text=wind_texts,
+    gen = gen[gen.index.get_level_values('State').isin(STATE_BOXES.index)]
+    # Aggregated mode draws one cloud per state over all years instead of one per state-year row
+    if mode == 'aggregated':
+        gen = gen.groupby(level='State', sort=True)[GENERATION_METRICS].sum()
+        years = np.full(len(gen), 'all', dtype=object)
+    else:
+        years = gen.index.get_level_values('Year').to_numpy()
+    solar_energy = gen['Solar_Generation_MWh'].to_numpy()
+    wind_energy = gen['Wind_Generation_MWh'].to_numpy()
+    total_energy = solar_energy + wind_energy
+    keep = total_energy > 0
+    # More rows than points: a per-row cloud can't be drawn, so fall back to the density summary
+    if keep.sum() > budget:
+        return create_cloud_summary_traces(gen[keep])
+    states = gen.index.get_level_values('State').to_numpy()[keep]
+    years = years[keep]
+    solar_energy, wind_energy, total_energy = solar_energy[keep], wind_energy[keep], total_energy[keep]
+
+    # Clamp point count per row; over budget, share the budget by energy instead
+    total_points = np.clip((total_energy * scale_points_per_1000).astype(int), 10, 150)
+    if total_points.sum() > budget:
+        total_points = np.minimum(apportion(total_energy, budget), 150)
+    # Split the row's points by energy type
+    solar_points_count = (total_points * (solar_energy / total_energy)).astype(int)
+    wind_points_count = total_points - solar_points_count
+
+    traces = []
+    for typ, counts, energy, color in [('Solar', solar_points_count, solar_energy, SOLAR_COLOR),
+                                       ('Wind', wind_points_count, wind_energy, WIND_COLOR)]:
+        point_states = np.repeat(states, counts)
+        keys = [f"{state}|{year}|{typ.lower()}-cloud" for state, year in zip(states, years)]
+        units = point_samples(keys, counts, PERSIST_POINTS)
+        lat, lon = generate_random_coords(point_states, units)
+        traces.append(dict(
+            type='scattergeo',
+            lon=lon, lat=lat,
+            customdata=np.column_stack([point_states, np.repeat(energy, counts)]),
             mode='markers',
-            marker=dict(size=18 + 4 * np.random.rand(wind_points_count),
-                        color=WIND_COLOR,
-                        opacity=0.5 + 0.3 * np.random.rand(wind_points_count)),
-            name=f"Wind Clouds - {state}",
-            hovertemplate='%{text}<extra></extra>',
+            marker=dict(size=20, color=color, opacity=0.6),
+            name=f"{typ} Clouds",
+            hovertemplate=f'%{{customdata[0]}} - {typ} Generation Cloud<br>Energy: %{{customdata[1]:,}} MWh<extra></extra>',
             visible=False,
             showlegend=False
         ))
 
-    return solar_cloud_traces, wind_cloud_traces
+    return traces[0], traces[1]
+
+# Indices of each state's points within a map layer trace, found in a single grouping pass
+def state_point_indices(trace):
+    customdata = np.asarray(trace['customdata'], dtype=object)
+    point_states = customdata[:, 0] if customdata.ndim == 2 else customdata
+    return pd.Series(point_states).groupby(point_states).indices
+
+# Hover data for one state's points of a map layer: the state is written into the hover template, leaving
+# clouds only their energy per point as a numeric array (plants need no customdata at all)
+def state_hover(trace, indices, state):
+    customdata = np.asarray(trace['customdata'], dtype=object)[indices]
+    template = trace['hovertemplate'].replace('%{customdata}', state).replace('%{customdata[0]}', state)
+    if customdata.ndim == 2:
+        return customdata[:, 1].astype(float), template.replace('%{customdata[1]', '%{customdata')
+    return None, template
+
+# One state's points of a map layer as a hidden trace of their own, with the state kept in the hover text
+# rather than repeated on every point
+def state_points_trace(trace, indices, state):
+    subset = {key: value for key, value in trace.items() if key != 'customdata'}
+    for key in ('lat', 'lon'):
+        subset[key] = np.asarray(trace[key])[indices]
+    # Per-point marker arrays (cloud size/opacity) follow their points
+    subset['marker'] = {key: np.asarray(value)[indices] if np.ndim(value) == 1 else value
+                        for key, value in trace['marker'].items()}
+    customdata, subset['hovertemplate'] = state_hover(trace, indices, state)
+    if customdata is not None:
+        subset['customdata'] = customdata
+    subset['visible'] = False
+    return subset
 
 # Create bubble chart: Sales vs Profit
+@profiled
 def create_bubble_chart_per_state(state_df):
+    # Named colorscales are expanded here, as plotly's validator would, so trace dicts need no validation
+    colorscale = get_colorscale('blues')
     traces = []
     for _, row in state_df.iterrows():
-        traces.append(go.Scatter(
+        traces.append(dict(
+            type='scatter',
             x=[row['Sales']],
             y=[row['Profit']],
             mode='markers',
             marker=dict(
                 size=row['Discount'] * 150,
                 color=row['Total_Plants'],
-                colorscale='blues',
+                colorscale=colorscale,
                 showscale=False
             ),
             hovertemplate=f"<b>{row['State']}</b><br>Sales: {row['Sales']}<br>Profit: {row['Profit']}<extra></extra>",
             name=f"Bubble - {row['State']}",
-            visible=False,
+            visible=True,
             showlegend=False
         ))
     return traces
 
-# Create line chart: yearly sales trend per state
-def create_line_chart_per_state(yearly):
+# Contiguous runs of each state's rows in a (State, Year)-sorted index: run states, start and stop positions
+def state_runs(index):
+    states = index.get_level_values('State').to_numpy()
+    if not len(states):
+        return states, np.empty(0, dtype=int), np.empty(0, dtype=int)
+    starts = np.flatnonzero(np.r_[True, states[1:] != states[:-1]])
+    return states[starts], starts, np.r_[starts[1:], len(states)]
+
+# Line color per run, as a position in LINE_COLORS: states are colored in the order they first appear
+# (by year, then name), so rows for later years keep them
+def run_colors(run_states, first_years):
+    order = pd.DataFrame({'State': run_states, 'Year': first_years}).sort_values(['Year', 'State']).index
+    color_index = np.empty(len(order), dtype=int)
+    color_index[order] = np.arange(len(order))
+    return color_index % len(LINE_COLORS)
+
+# Create line chart: yearly sales trend per state (optionally only some states, colored as in the full chart).
+# 'per_state' mode makes one trace per state; 'combined' mode puts every state in one trace
+@profiled
+def create_line_chart_per_state(frame, only_states=None, mode=None):
+    sales = sales_trend(frame)
+    timed = 'Time' in sales.index.names
+    # The frame is sorted by state and time, so each state's series is one contiguous slice of these arrays
+    run_states, starts, stops = state_runs(sales.index)
+    # Long sub-annual series keep a bounded number of points per state, picked with LTTB
+    if LINE_POINTS_PER_STATE and (stops - starts).max(initial=0) > LINE_POINTS_PER_STATE:
+        positions = sales.index.get_level_values('Time').asi8 if timed else sales.index.get_level_values('Year')
+        sales = sales.iloc[lttb_indices(positions, sales.to_numpy(), starts, stops, LINE_POINTS_PER_STATE)]
+        run_states, starts, stops = state_runs(sales.index)
+    x = sales.index.get_level_values('Time' if timed else 'Year').to_numpy()
+    values = sales.to_numpy()
+    colors = run_colors(run_states, sales.index.get_level_values('Year').to_numpy()[starts])
+    x_label = line_x_label(frame)
+    if (mode or LINE_MODE) == 'combined':
+        return [create_combined_line_chart(sales, x, values, starts, stops, colors, x_label)]
+
     traces = []
-    color_palette = qualitative.Plotly + qualitative.Dark24 + qualitative.Light24
-    states = yearly['State'].unique()
-    for i, state in enumerate(states):
-        data = yearly[yearly['State'] == state]
-        traces.append(go.Scatter(
-            x=data['Year'],
-            y=data['Sales'],
+    for state, start, stop, color in zip(run_states, starts, stops, colors):
+        if only_states is not None and state not in only_states:
+            continue
+        traces.append(dict(
+            type='scatter',
+            x=x[start:stop],
+            y=values[start:stop],
             mode='lines+markers',
             name=f"Line - {state}",
-            hovertemplate=f"<b>{state}</b><br>Year: %{{x}}<br>Sales: %{{y}}<extra></extra>",
-            line=dict(color=color_palette[i % len(color_palette)]),
-            visible=True
+            hovertemplate=f"<b>{state}</b><br>{x_label}: %{{x}}<br>Sales: %{{y}}<extra></extra>",
+            line=dict(color=LINE_COLORS[color]),
+            visible=False
         ))
     return traces
 
-# Create grouped bar chart: solar vs wind energy
-def create_power_bar_chart_per_state(df_gen):
-    states = df_gen['State'].tolist()
-    solar_values = df_gen['Solar_Generation_MWh'].tolist()
-    wind_values = df_gen['Wind_Generation_MWh'].tolist()
+# Line chart x axis title: dates for timestamped inputs, years otherwise
+def line_x_label(frame):
+    return 'Date' if 'Time' in frame.index.names else 'Year'
 
-    solar_trace = go.Bar(
+# Every state's sales line in one trace: a NaN value at each state's first point breaks the line from the
+# previous state, and the state of each point is kept in customdata for hover text and dropdown selection
+def create_combined_line_chart(sales, x, values, starts, stops, colors, x_label='Year'):
+    states = sales.index.get_level_values('State').to_numpy()
+    # Markers take their state's color through a stepped colorscale over palette positions,
+    # which stays a compact numeric array where per-point color strings would not
+    point_colors = np.repeat(colors, stops - starts)
+    steps = len(LINE_COLORS) - 1
+    gaps = starts[1:]
+    return dict(
+        type='scatter',
+        x=np.insert(x, gaps, x[gaps]),
+        y=np.insert(values.astype('float64'), gaps, np.nan),
+        customdata=np.insert(states, gaps, states[gaps]),
+        mode='lines+markers',
+        name="Sales by State",
+        connectgaps=False,
+        marker=dict(color=np.insert(point_colors, gaps, point_colors[gaps]), cmin=0, cmax=steps,
+                    colorscale=[[i / steps, color] for i, color in enumerate(LINE_COLORS)], showscale=False),
+        line=dict(color='gray', width=1),
+        unselected=dict(marker=dict(opacity=0.15)),
+        hovertemplate=f"<b>%{{customdata}}</b><br>{x_label}: %{{x}}<br>Sales: %{{y}}<extra></extra>",
+        visible=False,
+        showlegend=False
+    )
+
+# Generation totals per state (or per year and state) converted to million MWh in one vectorized step
+def aggregate_generation(gen, by_year=False):
+    keys = ['Year', 'State'] if by_year else ['State']
+    return gen.groupby(level=keys, sort=True)[GENERATION_METRICS].sum() / 1_000_000
+
+# Create grouped bar chart: solar vs wind energy per state, optionally stacked by year
+@profiled
+def create_power_bar_chart_per_state(gen, grouping=None):
+    if (grouping or BAR_GROUPING) == 'year':
+        return create_power_bar_chart_by_year(gen)
+    totals = aggregate_generation(gen)
+    states = totals.index.tolist()
+
+    solar_trace = dict(
+        type='bar',
         x=states,
-        y=[v / 1_000_000 for v in solar_values],  # Convert to million MWh
+        y=totals['Solar_Generation_MWh'].to_numpy(),  # million MWh
         name='Solar Power (M MWh)',
-        marker_color='orange',
+        marker=dict(color='orange'),
         hovertemplate='<b>%{x}</b><br>Solar Power: %{y:.2f} M MWh<extra></extra>',
         visible=True,
         showlegend=True
     )
 
-    wind_trace = go.Bar(
+    wind_trace = dict(
+        type='bar',
         x=states,
-        y=[v / 1_000_000 for v in wind_values],
+        y=totals['Wind_Generation_MWh'].to_numpy(),
         name='Wind Power (M MWh)',
-        marker_color='royalblue',
+        marker=dict(color='royalblue'),
         hovertemplate='<b>%{x}</b><br>Wind Power: %{y:.2f} M MWh<extra></extra>',
         visible=True,
         showlegend=True
     )
 
     return [solar_trace, wind_trace]
-def build_layout():
-    # Load datasets and metrics
-    df, state_df, yearly, stats = load_data()
-    df_gen = load_generation_data()
 
-    # Dashboard title/description (shown as annotation)
-    description_text = (
-        "State-Level Visualization of <br>Solar and "
-        "Wind Energy Infrastructure <br>Across the <br>United States"
+# Bars per state with each year stacked in its own trace: solar and wind stacks side by side
+def create_power_bar_chart_by_year(gen):
+    totals = aggregate_generation(gen, by_year=True)
+    # Reindex so every year trace has a value for every state, in the same order
+    years = totals.index.get_level_values('Year').unique().sort_values()
+    states = totals.index.get_level_values('State').unique().sort_values()
+    totals = totals.reindex(pd.MultiIndex.from_product([years, states]), fill_value=0)
+    traces = []
+    for typ, column, color in [('Solar', 'Solar_Generation_MWh', 'orange'),
+                               ('Wind', 'Wind_Generation_MWh', 'royalblue')]:
+        values = totals[column].to_numpy().reshape(len(years), len(states))
+        for i, year in enumerate(years):
+            traces.append(dict(
+                type='bar',
+                x=states.tolist(),
+                y=values[i],
+                name=f'{typ} Power (M MWh)',
+                legendgroup=typ,
+                offsetgroup=typ,
+                marker=dict(color=color, opacity=0.4 + 0.6 * (i + 1) / len(years),
+                            line=dict(color='white', width=0.5)),
+                hovertemplate=f'<b>%{{x}}</b><br>{typ} Power {year}: %{{y:.2f}} M MWh<extra></extra>',
+                visible=True,
+                showlegend=i == len(years) - 1
+            ))
+    return traces
+
+# Registry recording each trace's layer, state and chart as it's added to the figure
+class TraceRegistry:
+    def __init__(self, fig):
+        self.fig = fig
+        self.layers = []
+        self.states = []
+        self.charts = []
+        self.point_indices = []
+        self.state_point_layers = []
+
+    # Add a group of traces (objects or dicts) to one subplot; per_point layers record each state's point indices,
+    # and state_points layers are followed by a hidden '<layer>_state' trace per state holding that state's points
+    def add(self, traces, layer, chart, row, col, states=None, per_point=False, state_points=False):
+        traces = list(traces)
+        if isinstance(self.fig, dict):
+            # Figure dicts take the trace dicts as they are, pointed at the cell's precomputed references
+            refs = subplot_template()[1][(row, col)]
+            added = [dict(trace, **refs) for trace in traces]
+            self.fig['data'].extend(added)
+        else:
+            self.fig.add_traces(traces, rows=[row] * len(traces), cols=[col] * len(traces))
+            added = self.fig.data[len(self.fig.data) - len(traces):]
+        self.layers.extend([layer] * len(traces))
+        self.states.extend(states if states is not None else [None] * len(traces))
+        self.charts.extend([chart] * len(traces))
+        self.point_indices.extend(state_point_indices(t) if per_point else None for t in added)
+        if state_points:
+            self.state_point_layers.append(layer)
+            for trace in traces:
+                indices = state_point_indices(trace)
+                self.add([state_points_trace(trace, i, state) for state, i in indices.items()],
+                         f'{layer}_state', chart, row, col, states=list(indices))
+
+    # Boolean mask of the traces belonging to any of the given layers
+    def layer_mask(self, *layers):
+        return np.isin(np.array(self.layers, dtype=object), layers)
+
+    # Boolean matrix with one row per state marking the traces recorded for that state
+    def state_masks(self, states):
+        codes = pd.Categorical(self.states, categories=states).codes
+        return codes[None, :] == np.arange(len(states))[:, None]
+
+    # Restyle arguments for a dropdown entry: trace visibility, plus the point selection limiting per-point
+    # layers to one state (None clears it) when any layer selects points, since a list of nulls only adds size
+    def restyle(self, visible, state=None):
+        args = {"visible": visible.tolist()}
+        if any(indices is not None for indices in self.point_indices):
+            args["selectedpoints"] = self.selected_points(state)
+        return [args]
+
+    # selectedpoints restyle value limiting per-point layers to one state (None clears selection)
+    def selected_points(self, state=None):
+        return [
+            None if state is None or indices is None
+            else indices.get(state, np.empty(0, dtype=int)).tolist()
+            for indices in self.point_indices
+        ]
+
+# Hash of the code cached results are built with: this module and the modules it reads, aggregates,
+# places points and downsamples through
+@functools.lru_cache(maxsize=None)
+def code_hash():
+    directory = os.path.dirname(os.path.abspath(__file__))
+    modules = ('viz', 'config', 'columnar_cache', 'incremental', 'coords', 'downsample')
+    return cache_key(*(file_hash(os.path.join(directory, f"{module}.py")) for module in modules))
+
+# Module settings that shape the frame, traces and figure, read at call time so overrides made after
+# import change the cache keys too
+def settings_key():
+    return cache_key(TIME_RESOLUTION, LINE_MODE, LINE_POINTS_PER_STATE, LINE_COLORS, BAR_GROUPING, CLOUD_MODE,
+                     CLOUD_POINT_BUDGET, ALL_STATES, SOLAR_COLOR, WIND_COLOR, STATE_BOXES.to_json())
+
+# Cache key for everything derived from one input file (its content, the chunking, the code and settings);
+# the content hash is only recomputed when the file's mtime or size moved
+def input_key(path, chunksize):
+    try:
+        return cache_key(source_hash(path), chunksize, code_hash(), settings_key())
+    except FileNotFoundError:
+        print(f"File not found: {path}")
+        sys.exit(1)
+
+# Compute a result through the on-disk result cache when it's enabled
+def cached_result(key, compute):
+    return cached(key, compute) if USE_RESULT_CACHE else compute()
+
+# Traces derived from the frame's main-data columns, as plain dicts grouped by layer
+def build_main_traces(frame):
+    summary = state_summary(frame)
+    (solar_trace, wind_trace), bubbles, lines = run_all(
+        lambda: create_map_traces_per_state(summary),
+        lambda: create_bubble_chart_per_state(summary),
+        lambda: create_line_chart_per_state(frame),
     )
+    traces = {
+        'solar_plants': [solar_trace],
+        'wind_plants': [wind_trace],
+        'bubble': bubbles,  # shown by default
+        'line': lines,  # hidden by default
+    }
+    return traces
 
-    # Set up subplot grid
-    fig = make_subplots(
+# Traces derived from the frame's generation columns, as plain dicts grouped by layer
+def build_generation_traces(frame):
+    gen = generation_frame(frame)
+    (solar_cloud_trace, wind_cloud_trace), bars = run_all(
+        lambda: create_generation_clouds_per_state(gen),
+        lambda: create_power_bar_chart_per_state(gen),
+    )
+    traces = {
+        'solar_clouds': [solar_cloud_trace],  # hidden by default
+        'wind_clouds': [wind_cloud_trace],
+        'bar': bars,
+    }
+    return traces
+
+# Set up the dashboard's subplot grid
+@profiled
+def create_subplot_grid():
+    # Imported here: the fast path reads the grid from the persisted template and never needs plotly's figure classes
+    from plotly.subplots import make_subplots
+    return make_subplots(
         rows=7, cols=2,
         column_widths=[0.6, 0.4],
         row_heights=[0.6, 0, 0.25, 0.15, 0, 0, 0],
@@ -283,97 +753,123 @@ def build_layout():
         ]
     )
 
-    # Generate all trace types
-    solar_traces, wind_traces = create_map_traces_per_state(state_df)
-    solar_cloud_traces, wind_cloud_traces = create_generation_clouds_per_state(df_gen)
-    bubble_traces = create_bubble_chart_per_state(state_df)
-    line_traces = create_line_chart_per_state(yearly)
-    power_bar_traces = create_power_bar_chart_per_state(df_gen)
-
-    # Add traces to respective positions
-    for trace in solar_traces + wind_traces:
-        trace.visible = True  # show plants by default
-        fig.add_trace(trace, row=1, col=1)
-    for trace in solar_cloud_traces + wind_cloud_traces:
-        trace.visible = False  # hide energy clouds by default
-        fig.add_trace(trace, row=1, col=1)
-    for trace in bubble_traces:
-        trace.visible = True  # show bubbles by default
-        fig.add_trace(trace, row=1, col=2)
-    for trace in line_traces:
-        trace.visible = False  # hide line chart by default
-        fig.add_trace(trace, row=4, col=2)
-    for trace in power_bar_traces:
-        trace.visible = True
-        fig.add_trace(trace, row=4, col=1)
+# Layout of the subplot grid and each cell's trace references (geo, or xaxis/yaxis), computed once
+# and kept in the result cache (per plotly version and this code) so later processes skip make_subplots
+@functools.lru_cache(maxsize=None)
+def subplot_template():
+    return cached_result(cache_key('subplot-template', plotly.__version__, code_hash()), grid_template)
 
-    # Dropdown for all states
-    all_states = state_df['State'].tolist()
+# Subplot grid layout and cell references, from make_subplots
+def grid_template():
+    grid = create_subplot_grid()
+    return grid.layout.to_plotly_json(), grid_refs(grid)
 
-    # Identify bar chart traces so they are always visible
-    bar_trace_indices = [
-        i for i, trace in enumerate(fig.data)
-        if 'Solar Power' in trace.name or 'Wind Power' in trace.name
-    ]
+# Each cell's trace references (geo, or xaxis/yaxis) in the make_subplots grid
+def grid_refs(grid):
+    refs = {}
+    cells = [(row, col) for row in range(1, 8) for col in (1, 2)]  # the 7x2 grid
+    for row, col in cells:
+        subplot = grid.get_subplot(row, col)
+        if subplot is None:
+            continue
+        if hasattr(subplot, 'xaxis'):
+            # Layout axis names map to trace references: xaxis2 -> x2
+            refs[(row, col)] = {axis: getattr(subplot, axis).plotly_name.replace('axis', '')
+                                for axis in ('xaxis', 'yaxis')}
+        else:
+            refs[(row, col)] = {'geo': subplot.plotly_name}
+    return refs
+
+# Empty figure dict on the subplot grid, for the fast path
+def new_figure_dict():
+    return {'data': [], 'layout': copy.deepcopy(subplot_template()[0])}
+
+# Add prepared traces to their subplots, recording layer and state for each in a registry
+@profiled
+def add_dashboard_traces(fig, states, main_traces, generation_traces):
+    registry = TraceRegistry(fig)
+    # Picking a state swaps each map layer for its traces of that state's points: points merely hidden
+    # by selection would still catch hover. Split output's placeholders are filled with the state's points instead
+    state_points = 'state_line' not in main_traces
+    registry.add(main_traces['solar_plants'], 'solar_plants', 'map', row=1, col=1, state_points=state_points)
+    registry.add(main_traces['wind_plants'], 'wind_plants', 'map', row=1, col=1, state_points=state_points)
+    registry.add(generation_traces['solar_clouds'], 'solar_clouds', 'map', row=1, col=1, state_points=state_points)
+    registry.add(generation_traces['wind_clouds'], 'wind_clouds', 'map', row=1, col=1, state_points=state_points)
+    registry.add(main_traces['bubble'], 'bubble', 'bubble', row=1, col=2, states=states)
+    if 'state_line' in main_traces:
+        # Split output: a single line trace, restyled to whichever state is selected
+        registry.add(main_traces['state_line'], 'state_line', 'line', row=4, col=2)
+    elif LINE_MODE == 'combined':
+        # One line trace for every state; the dropdown selects a state's points like the map layers
+        registry.add(main_traces['line'], 'combined_line', 'line', row=4, col=2, per_point=True)
+    else:
+        registry.add(main_traces['line'], 'line', 'line', row=4, col=2, states=states)
+    registry.add(generation_traces['bar'], 'bar', 'bar', row=4, col=1)
+    return registry
+
+# Build the state dropdown and the plant/cloud toggle buttons from registry masks
+@profiled
+def build_buttons(registry, all_states):
+    # Visibility vectors as boolean masks: bar chart traces are always visible
+    always = registry.layer_mask('bar')
+    map_layers = registry.layer_mask('solar_plants', 'wind_plants', 'solar_clouds', 'wind_clouds')
+    bubbles = registry.layer_mask('bubble')
 
     buttons = []
 
     # Button: show all states' bubbles & plants
-    visible_all = [
-        True if i in bar_trace_indices else
-        ("Solar Plants" in trace.name or "Wind Plants" in trace.name or "Bubble" in trace.name)
-        for i, trace in enumerate(fig.data)
-    ]
-    buttons.append(dict(label="All States", method="update", args=[{"visible": visible_all}]))
-
-    # One button per state — show that state only
-    for state in all_states:
-        vis = []
-        for i, trace in enumerate(fig.data):
-            if i in bar_trace_indices:
-                vis.append(True)
-            elif state in trace.name:
-                vis.append(True)
-            else:
-                vis.append(False)
-        buttons.append(dict(label=state, method="update", args=[{"visible": vis}]))
+    visible_all = always | bubbles | registry.layer_mask('solar_plants', 'wind_plants')
+    buttons.append(dict(label=ALL_STATES, method="update", args=registry.restyle(visible_all)))
+
+    # One button per state — show that state only: its own map point traces replace the whole layers
+    shared_map_layers = map_layers & ~registry.layer_mask(*registry.state_point_layers)
+    state_visible = (registry.state_masks(all_states) | always | shared_map_layers
+                     | registry.layer_mask('state_line', 'combined_line'))
+    for state, vis in zip(all_states, state_visible):
+        buttons.append(dict(label=state, method="update", args=registry.restyle(vis, state)))
 
     # Buttons to toggle between plants/clouds
+    toggles = [
+        ("Both Plants", bubbles | registry.layer_mask('solar_plants', 'wind_plants')),
+        ("Solar Plants Only", bubbles | registry.layer_mask('solar_plants')),
+        ("Wind Plants Only", bubbles | registry.layer_mask('wind_plants')),
+        ("Solar Energy Accumulation", registry.layer_mask('solar_clouds')),
+        ("Wind Energy Accumulation", registry.layer_mask('wind_clouds')),
+    ]
     plant_cloud_buttons = [
-        dict(label="Both Plants", method="update",
-             args=[{"visible": [
-                 True if i in bar_trace_indices else
-                 ("Solar Plants" in t.name or "Wind Plants" in t.name or "Bubble" in t.name)
-                 for i, t in enumerate(fig.data)
-             ]}]),
-        dict(label="Solar Plants Only", method="update",
-             args=[{"visible": [
-                 True if i in bar_trace_indices else
-                 ("Solar Plants" in t.name or "Bubble" in t.name)
-                 for i, t in enumerate(fig.data)
-             ]}]),
-        dict(label="Wind Plants Only", method="update",
-             args=[{"visible": [
-                 True if i in bar_trace_indices else
-                 ("Wind Plants" in t.name or "Bubble" in t.name)
-                 for i, t in enumerate(fig.data)
-             ]}]),
-        dict(label="Solar Energy Accumulation", method="update",
-             args=[{"visible": [
-                 True if i in bar_trace_indices else
-                 ("Solar Clouds" in t.name)
-                 for i, t in enumerate(fig.data)
-             ]}]),
-        dict(label="Wind Energy Accumulation", method="update",
-             args=[{"visible": [
-                 True if i in bar_trace_indices else
-                 ("Wind Clouds" in t.name)
-                 for i, t in enumerate(fig.data)
-             ]}]),
+        dict(label=label, method="update", args=registry.restyle(always | mask))
+        for label, mask in toggles
     ]
+    return buttons, plant_cloud_buttons
+
+# Layout properties for one cell's axis titles, keyed by that cell's layout axis names
+def axis_titles(refs, row, col, x_title, y_title):
+    refs = refs[(row, col)]
+    # Trace references map back to layout axis names: x2 -> xaxis2
+    return {
+        refs['xaxis'].replace('x', 'xaxis', 1): dict(title=dict(text=x_title)),
+        refs['yaxis'].replace('y', 'yaxis', 1): dict(title=dict(text=y_title)),
+    }
+
+# Merge layout properties into a layout dict the way update_layout does: nested dicts merge, other values replace
+def merge_layout(layout, update):
+    for key, value in update.items():
+        if isinstance(value, dict) and isinstance(layout.get(key), dict):
+            merge_layout(layout[key], value)
+        else:
+            layout[key] = value
+    return layout
+
+# Dashboard layout, menus, geo/axis styling and annotations as one layout dict
+def dashboard_layout(buttons, plant_cloud_buttons, refs, line_x_title='Year'):
+    # Dashboard title/description (shown as annotation)
+    description_text = (
+        "State-Level Visualization of <br>Solar and "
+        "Wind Energy Infrastructure <br>Across the <br>United States"
+    )
 
     # Set dashboard layout and style
-    fig.update_layout(
+    layout = dict(
         paper_bgcolor="#f5f9f6",  # dashboard background
         plot_bgcolor="white",     # plot background
         font=dict(color="#264653"),
@@ -387,6 +883,8 @@ def build_layout():
         margin=dict(t=110, l=20, r=20, b=20),
         showlegend=True,
         legend=dict(orientation="h", x=0.5, xanchor="center", y=1.02),
+        # Year-stacked bars stack within their solar/wind offset group
+        barmode='relative' if BAR_GROUPING == 'year' else 'group',
         updatemenus=[
             # Top toggle buttons (plants)
             dict(
@@ -421,77 +919,374 @@ def build_layout():
                 xanchor="left",
                 showactive=True,
             )
-        ]
-    )
-
-    # Configure geo map style
-    fig.update_geos(
-        scope='usa',
-        projection_type='albers usa',
-        showland=True,
-        landcolor='rgb(217, 217, 217)'
+        ],
+        # Configure geo map style
+        geo=dict(
+            scope='usa',
+            projection=dict(type='albers usa'),
+            showland=True,
+            landcolor='rgb(217, 217, 217)'
+        ),
     )
 
     # Set axis labels
-    fig.update_xaxes(title_text='Sales', row=1, col=2)
-    fig.update_yaxes(title_text='Profit', row=1, col=2)
-    fig.update_xaxes(title_text='Year', row=4, col=2)
-    fig.update_yaxes(title_text='Sales', row=4, col=2)
-    fig.update_xaxes(title_text='States', row=4, col=1)
-    fig.update_yaxes(title_text='Power', row=4, col=1)
+    layout.update(axis_titles(refs, 1, 2, 'Sales', 'Profit'))
+    layout.update(axis_titles(refs, 4, 2, line_x_title, 'Sales'))
+    layout.update(axis_titles(refs, 4, 1, 'States', 'Power'))
 
     # Add descriptive annotations for charts
-    fig.add_annotation(
-        text=description_text,
-        xref='paper', yref='paper',
-        x=0.01, y=0.36,
-        showarrow=False,
-        align='left',
-        bordercolor='black',
-        borderwidth=1,
-        bgcolor='lightyellow',
-        font=dict(size=14)
-    )
+    layout['annotations'] = [
+        dict(
+            text=description_text,
+            xref='paper', yref='paper',
+            x=0.01, y=0.36,
+            showarrow=False,
+            align='left',
+            bordercolor='black',
+            borderwidth=1,
+            bgcolor='lightyellow',
+            font=dict(size=14)
+        ),
+        dict(
+            text="<b>Bubble Chart</b><br>Size represents Discount<br>Color = Total Plants<br>X: Sales, Y: Profit",
+            xref='paper', yref='paper',
+            x=0.71, y=0.98,
+            showarrow=False,
+            bgcolor='lightyellow',
+            font=dict(size=12)
+        ),
+        dict(
+            text="<b>Select a State to View Detailed Energy Analysis:</b>",
+            xref='paper', yref='paper',
+            x=0, y=1.05,
+            showarrow=False,
+            font=dict(size=12)
+        ),
+        dict(
+            text="<b>Line Chart</b><br>Sales trends over Years per State",
+            xref='paper', yref='paper',
+            x=0.78, y=0.27,
+            showarrow=False,
+            bgcolor='lightyellow',
+            font=dict(size=12)
+        ),
+        dict(
+            text="<b>Bar Graph</b><br>Solar and Wind Power Generation<br>(in Million MWh) per State",
+            xref='paper', yref='paper',
+            x=0.28, y=0.2,
+            showarrow=False,
+            bgcolor='lightyellow',
+            font=dict(size=12)
+        ),
+    ]
+    return layout
 
-    fig.add_annotation(
-        text="<b>Bubble Chart</b><br>Size represents Discount<br>Color = Total Plants<br>X: Sales, Y: Profit",
-        xref='paper', yref='paper',
-        x=0.71, y=0.98,
-        showarrow=False,
-        bgcolor='lightyellow',
-        font=dict(size=12)
-    )
+# Apply the dashboard layout to a figure, or merge it into a figure dict's subplot layout
+@profiled
+def style_dashboard(fig, buttons, plant_cloud_buttons, refs, line_x_title='Year'):
+    layout = dashboard_layout(buttons, plant_cloud_buttons, refs, line_x_title)
+    if isinstance(fig, dict):
+        merge_layout(fig['layout'], layout)
+    else:
+        fig.update_layout(layout)
 
-    fig.add_annotation(
-        text="<b>Select a State to View Detailed Energy Analysis:</b>",
-        xref='paper', yref='paper',
-        x=0, y=1.05,
-        showarrow=False,
-        font=dict(size=12)
-    )
+# Lay out the dashboard figure from prepared traces: subplots, trace registry, buttons and annotations
+# (as a plain figure dict on the fast path)
+def assemble_figure(frame, main_traces, generation_traces, fast=None):
+    fast = FAST_PATH if fast is None else fast
+    if fast:
+        fig, refs = new_figure_dict(), subplot_template()[1]
+    else:
+        # Cell references come from the grid itself, so the validated path runs make_subplots once
+        fig = create_subplot_grid()
+        refs = grid_refs(fig)
+    # Bubbles and lines both have one trace per state with main data, in frame order
+    states = main_states(frame)
+    registry = add_dashboard_traces(fig, states, main_traces, generation_traces)
+    # Dropdown for all states
+    buttons, plant_cloud_buttons = build_buttons(registry, states)
+    style_dashboard(fig, buttons, plant_cloud_buttons, refs, line_x_label(frame))
+    return fig
 
-    fig.add_annotation(
-        text="<b>Line Chart</b><br>Sales trends over Years per State",
-        xref='paper', yref='paper',
-        x=0.78, y=0.27,
-        showarrow=False,
-        bgcolor='lightyellow',
-        font=dict(size=12)
-    )
+# Point layer with some states' points dropped and another trace's points appended
+def splice_points(trace, extra, drop_states=()):
+    customdata = np.asarray(trace['customdata'], dtype=object)
+    point_states = customdata[:, 0] if customdata.ndim == 2 else customdata
+    keep = ~np.isin(point_states, list(drop_states))
+    extra_customdata = np.asarray(extra['customdata'], dtype=object)
+    extra_states = extra_customdata[:, 0] if extra_customdata.ndim == 2 else extra_customdata
+    # A full build emits points grouped by state, so a stable sort restores that order
+    order = np.argsort(np.concatenate([point_states[keep], extra_states]).astype(str), kind='stable')
+    spliced = dict(trace)
+    for key in ('lat', 'lon', 'customdata'):
+        spliced[key] = np.concatenate([np.asarray(trace[key])[keep], np.asarray(extra[key])])[order]
+    # Per-point marker arrays (cloud size/opacity) follow their points
+    marker = dict(trace['marker'])
+    for key in ('size', 'opacity'):
+        if np.ndim(marker.get(key)) == 1:
+            marker[key] = np.concatenate([np.asarray(marker[key])[keep], np.asarray(extra['marker'][key])])[order]
+    spliced['marker'] = marker
+    return spliced
+
+# Per-state traces in the given state order, taking states present in `fresh` from there
+def merge_state_traces(stored, fresh, prefix, states):
+    by_name = {t['name']: t for t in stored}
+    by_name.update({t['name']: t for t in fresh})
+    return [by_name[f"{prefix} - {state}"] for state in states]
+
+# Update stored main traces for the states touched by appended rows
+def patch_main_traces(traces, frame, affected):
+    summary = state_summary(frame)
+    affected_summary = summary[summary['State'].isin(affected)]
+    solar_trace, wind_trace = create_map_traces_per_state(affected_summary)
+    fresh_bubbles = create_bubble_chart_per_state(affected_summary)
+    if LINE_MODE == 'combined':
+        # The combined line is one vectorized trace over the frame, so it's rebuilt rather than patched
+        lines = create_line_chart_per_state(frame)
+    else:
+        fresh_lines = create_line_chart_per_state(frame, only_states=affected)
+        lines = merge_state_traces(traces['line'], fresh_lines, 'Line', summary['State'])
+    return {
+        'solar_plants': [splice_points(traces['solar_plants'][0], solar_trace, affected)],
+        'wind_plants': [splice_points(traces['wind_plants'][0], wind_trace, affected)],
+        'bubble': merge_state_traces(traces['bubble'], fresh_bubbles, 'Bubble', summary['State']),
+        'line': lines,
+    }
+
+# Chunks of an input file for a full pass
+def read_all_rows(path, dtypes, chunksize):
+    chunks = read_csv_chunks(path, dtypes, chunksize)
+    return chunks if chunksize else [chunks]
+
+# Bring the main-data checkpoint up to date, folding in only rows appended since it was stored
+def update_main_checkpoint(chunksize):
+    key = cache_key('main-checkpoint', os.path.abspath(DATA_FILE), code_hash(), settings_key())
+    checkpoint = cache_get(key)
+    dtypes = input_dtypes(DATA_FILE, MAIN_DTYPES)
+    appended = read_appended_rows(DATA_FILE, checkpoint, dtypes, chunksize) if checkpoint else None
+    if appended == []:
+        return checkpoint
+
+    full_pass = appended is None
+    totals = None if full_pass else checkpoint['totals']
+    affected = set()
+    for chunk in read_all_rows(DATA_FILE, MAIN_DTYPES, chunksize) if full_pass else appended:
+        totals = accumulate(totals, aggregate_main_chunk(chunk))
+        affected.update(chunk['State'].astype(str).unique())
+    frame = build_frame(main_totals=totals)
 
-    fig.add_annotation(
-        text="<b>Bar Graph</b><br>Solar and Wind Power Generation<br>(in Million MWh) per State",
-        xref='paper', yref='paper',
-        x=0.28, y=0.2,
-        showarrow=False,
-        bgcolor='lightyellow',
-        font=dict(size=12)
+    if full_pass:
+        traces = build_main_traces(frame)
+    else:
+        traces = patch_main_traces(checkpoint['traces'], frame, affected)
+    checkpoint = {**file_checkpoint(DATA_FILE), 'totals': totals, 'traces': traces}
+    cache_put(key, checkpoint)
+    return checkpoint
+
+# Bring the generation checkpoint up to date, folding in only rows appended since it was stored
+def update_generation_checkpoint(chunksize):
+    key = cache_key('generation-checkpoint', os.path.abspath(GENERATION_FILE), code_hash(), settings_key())
+    checkpoint = cache_get(key)
+    dtypes = input_dtypes(GENERATION_FILE, GENERATION_DTYPES)
+    appended = read_appended_rows(GENERATION_FILE, checkpoint, dtypes, chunksize) if checkpoint else None
+    if appended == []:
+        return checkpoint
+
+    full_pass = appended is None
+    totals = None if full_pass else checkpoint['totals']
+    for chunk in read_all_rows(GENERATION_FILE, GENERATION_DTYPES, chunksize) if full_pass else appended:
+        totals = accumulate(totals, aggregate_generation_chunk(chunk))
+
+    # Generation traces are rebuilt from the merged totals: cloud points are stable per key and
+    # bounded by the point budget, and the bars are two vectorized traces
+    traces = build_generation_traces(build_frame(generation_totals=totals))
+    checkpoint = {**file_checkpoint(GENERATION_FILE), 'totals': totals, 'traces': traces}
+    cache_put(key, checkpoint)
+    return checkpoint
+
+# Incremental build inputs: aggregates and traces come from checkpoints patched with appended rows only
+def incremental_inputs(chunksize):
+    for path in (DATA_FILE, GENERATION_FILE):
+        if not os.path.exists(path):
+            print(f"File not found: {path}")
+            sys.exit(1)
+    main, generation = run_all(lambda: update_main_checkpoint(chunksize),
+                               lambda: update_generation_checkpoint(chunksize))
+    frame = build_frame(main['totals'], generation['totals'])
+    return frame, main['traces'], generation['traces']
+
+# Full build inputs: the unified frame and traces, each input's derived traces cached independently
+def dashboard_inputs(chunksize, main_key=None, generation_key=None):
+    # Load both datasets into the unified frame
+    frame = cached_result(cache_key('frame', main_key, generation_key), lambda: load_frame(chunksize))
+
+    # Generate all trace types
+    main_traces, generation_traces = run_all(
+        lambda: cached_result(cache_key('main-traces', main_key), lambda: build_main_traces(frame)),
+        lambda: cached_result(cache_key('generation-traces', generation_key), lambda: build_generation_traces(frame)),
     )
+    return frame, main_traces, generation_traces
+
+@profiled
+def build_layout(chunksize=None, incremental=None):
+    # Read the settings at call time so callers that change them after import are honoured
+    chunksize = CHUNK_SIZE if chunksize is None else chunksize
+    incremental = INCREMENTAL if incremental is None else incremental
+    if incremental:
+        return assemble_figure(*incremental_inputs(chunksize))
+
+    # Reuse the whole figure when neither input changed
+    if USE_RESULT_CACHE:
+        main_key = input_key(DATA_FILE, chunksize)
+        generation_key = input_key(GENERATION_FILE, chunksize)
+        figure_key = cache_key('figure', main_key, generation_key)
+        fig_json = cache_get(figure_key)
+        if fig_json is not None:
+            # The JSON came from an assembled figure, so skip re-validating it
+            fig_dict = json.loads(fig_json)
+            if FAST_PATH:
+                return fig_dict
+            import plotly.graph_objects as go
+            return go.Figure(fig_dict, _validate=False)
+    else:
+        main_key = generation_key = None
 
+    fig = assemble_figure(*dashboard_inputs(chunksize, main_key, generation_key))
+
+    if USE_RESULT_CACHE:
+        cache_put(figure_key, pio.to_json(fig, validate=False))
     return fig
 
-# Entry point to build and save dashboard
-if __name__ == "__main__":
-    fig = build_layout()
-    fig.write_html(OUTPUT_FILE)
-    print(f"Dashboard saved to {OUTPUT_FILE}")
+# Restyle properties for some of a map layer's points (all of them when indices is None)
+def point_props(trace, indices=None, state=None):
+    props = {}
+    for key in ('lat', 'lon'):
+        values = np.asarray(trace[key])
+        props[key] = values if indices is None else values[indices]
+    # One state's points take the state in the hover template, leaving clouds only their numeric energies;
+    # all states' points keep the per-point state. Either way the template is restored for the entry shown
+    if state is None:
+        props['customdata'] = np.asarray(trace['customdata'])
+        props['hovertemplate'] = trace['hovertemplate']
+    else:
+        customdata, props['hovertemplate'] = state_hover(trace, indices, state)
+        props['customdata'] = [] if customdata is None else customdata
+    # Per-point marker arrays (cloud size/opacity) follow their points
+    for key in ('size', 'opacity'):
+        values = trace['marker'].get(key)
+        if np.ndim(values) == 1:
+            props[f'marker.{key}'] = np.asarray(values) if indices is None else np.asarray(values)[indices]
+    return props
+
+# Split traces into overview traces and per-state detail payloads: map layers and the line chart become
+# empty placeholder traces (identified by uid), and each payload holds the restyle properties that fill
+# them for one dropdown entry
+def split_detail(main_traces, generation_traces, states):
+    layers = {**main_traces, **generation_traces}
+    placeholders = {}
+    for layer in DETAIL_LAYERS:
+        trace = layers[layer][0]
+        marker = {k: [] if np.ndim(v) == 1 else v for k, v in trace['marker'].items()}
+        placeholders[layer] = [dict(trace, lat=[], lon=[], customdata=[], marker=marker, uid=layer)]
+    first_line = main_traces['line'][0]
+    placeholders['state_line'] = [dict(first_line, x=[], y=[], name="Line", uid='state_line')]
+
+    payloads = {ALL_STATES: {layer: point_props(layers[layer][0]) for layer in DETAIL_LAYERS}}
+    indices = {layer: state_point_indices(layers[layer][0]) for layer in DETAIL_LAYERS}
+    lines = {trace['name']: trace for trace in main_traces['line']}
+    empty = np.empty(0, dtype=int)
+    for state in states:
+        payload = {layer: point_props(layers[layer][0], indices[layer].get(state, empty), state)
+                   for layer in DETAIL_LAYERS}
+        line = lines.get(f"Line - {state}")
+        if line is not None:
+            payload['state_line'] = {
+                'x': line['x'], 'y': line['y'], 'name': line['name'],
+                'hovertemplate': line['hovertemplate'], 'line.color': line['line']['color'],
+            }
+        payloads[state] = payload
+
+    overview_main = {key: placeholders.get(key, traces) for key, traces in main_traces.items() if key != 'line'}
+    overview_main['state_line'] = placeholders['state_line']
+    overview_generation = {key: placeholders.get(key, traces) for key, traces in generation_traces.items()}
+    return overview_main, overview_generation, payloads
+
+# Split build: the overview figure and its per-state detail payloads
+@profiled
+def build_split_layout(chunksize=None, incremental=None):
+    chunksize = CHUNK_SIZE if chunksize is None else chunksize
+    incremental = INCREMENTAL if incremental is None else incremental
+    if incremental:
+        inputs = incremental_inputs(chunksize)
+    elif USE_RESULT_CACHE:
+        inputs = dashboard_inputs(chunksize, input_key(DATA_FILE, chunksize), input_key(GENERATION_FILE, chunksize))
+    else:
+        inputs = dashboard_inputs(chunksize)
+    frame, main_traces, generation_traces = inputs
+    if LINE_MODE == 'combined':
+        # The page restyles its one line trace to the selected state, so payloads take per-state lines
+        main_traces = dict(main_traces, line=create_line_chart_per_state(frame, mode='per_state'))
+    overview_main, overview_generation, payloads = split_detail(main_traces, generation_traces, main_states(frame))
+    return assemble_figure(frame, overview_main, overview_generation), payloads
+
+# JSON form of a figure with typed arrays decoded to plain lists, for comparing figures
+def normalized_figure(fig):
+    def normalize(value):
+        arr = numeric_array(value) if isinstance(value, dict) else None
+        if arr is not None:
+            return arr.tolist()
+        if isinstance(value, dict):
+            return {key: normalize(v) for key, v in value.items()}
+        if isinstance(value, list):
+            return [normalize(v) for v in value]
+        return value
+    return normalize(json.loads(pio.to_json(fig, validate=False)))
+
+# Paths at which two normalized figures differ
+def figure_differences(a, b, path='fig'):
+    if isinstance(a, dict) and isinstance(b, dict):
+        return [diff for key in sorted(a.keys() | b.keys())
+                for diff in figure_differences(a.get(key), b.get(key), f"{path}.{key}")]
+    if isinstance(a, list) and isinstance(b, list) and len(a) == len(b):
+        return [diff for i, (x, y) in enumerate(zip(a, b)) for diff in figure_differences(x, y, f"{path}[{i}]")]
+    # Line gaps are NaN in typed arrays and null in JSON lists, which plotly.js draws the same
+    return [] if a == b or ((a is None or a != a) and (b is None or b != b)) else [path]
+
+# Build the dashboard on both the validated make_subplots path and the fast dict path from the same
+# inputs, and return where their figures differ (an empty list means they are equivalent)
+def verify_fast_path(chunksize=None):
+    chunksize = CHUNK_SIZE if chunksize is None else chunksize
+    frame = load_frame(chunksize)
+    main_traces = build_main_traces(frame)
+    generation_traces = build_generation_traces(frame)
+    validated = assemble_figure(frame, main_traces, generation_traces, fast=False)
+    fast = assemble_figure(frame, main_traces, generation_traces, fast=True)
+    return figure_differences(normalized_figure(validated), normalized_figure(fast))
+
+# Restrict the unified frame to the given states and inclusive (first, last) year range
+def filter_frame(frame, states=None, years=None):
+    mask = np.ones(len(frame), dtype=bool)
+    if states is not None:
+        mask &= frame.index.get_level_values('State').isin(states)
+    if years is not None:
+        year = frame.index.get_level_values('Year')
+        mask &= (year >= years[0]) & (year <= years[1])
+    return frame[mask]
+
+# Filters that match no rows of the unified frame, as messages like those of cli --check
+def filter_problems(frame, states=None, years=None):
+    problems = []
+    if states is not None:
+        present = set(frame.index.get_level_values('State'))
+        unknown = [state for state in states if state not in present]
+        if unknown:
+            problems.append(f"no rows for states {', '.join(unknown)}")
+    if years is not None and filter_frame(frame, years=years).empty:
+        problems.append(f"no rows in years {years[0]}-{years[1]}")
+    return problems
+
+# Build a dashboard from an already-loaded unified frame, optionally filtered to some states and years
+def build_dashboard(frame, states=None, years=None):
+    frame = filter_frame(frame, states, years)
+    main_traces, generation_traces = run_all(lambda: build_main_traces(frame), lambda: build_generation_traces(frame))
+    return assemble_figure(frame, main_traces, generation_traces)